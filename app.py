@@ -1,10 +1,16 @@
+from utils import startup
+
+startup.install_profiler()  # DOCQUIZ_IMPORT_PROFILE=1 → importtijden per module
+
 import tkinter as tk
 from models import QuestionBank, HistoryStore
-from engine import SpacedRepetitionEngine
+from utils.storage import SQLiteBackend, GitHubBackend
 from views.start_view import StartView
 from views.quiz_view import QuizView
 from views.result_view import ResultView
-import pandas as pd
+
+EXCEL_PATH = "data/quizvragen.xlsx"
+PREFETCH_AHEAD = 3  # afbeeldingen van zoveel volgende vragen alvast laden
 
 
 class DocQuizApp(tk.Tk):
@@ -15,7 +21,11 @@ class DocQuizApp(tk.Tk):
 
         # Data en engine (nog leeg bij start)
         self.qbank = None
-        self.history = HistoryStore()
+        # Lokaal in SQLite (werkt offline); GitHub alleen als sync-doel
+        self.history = HistoryStore(
+            backend=SQLiteBackend(),
+            remote=GitHubBackend.from_env(),
+        )
         self.engine = None
 
         # Variabelen
@@ -23,11 +33,14 @@ class DocQuizApp(tk.Tk):
         self.index = 0
         self.results = {"correct": 0, "wrong": 0}
 
-        # Ophalen van beschikbare vakken (tabbladen uit Excel)
+        # Beschikbare vakken (tabbladen uit Excel): de werkmap wordt één keer
+        # in zijn geheel omgezet en gecachet, quizstarts kiezen daarna uit geheugen
         try:
-            xls = pd.ExcelFile("data/quizvragen.xlsx")
-            self.available_subjects = xls.sheet_names
-        except Exception:
+            self.available_subjects = list(QuestionBank.load_workbook(EXCEL_PATH))
+        except Exception as e:
+            print(f"❌ Kon {EXCEL_PATH} niet laden: {e}")
+            self.available_subjects = []
+        if not self.available_subjects:
             self.available_subjects = ["DC", "AC", "Vermogen"]
 
         # Schermen
@@ -46,14 +59,24 @@ class DocQuizApp(tk.Tk):
     # -----------------------
     def start_quiz(self, num_questions, sheet_name):
         """Start quiz met x vragen uit gekozen vak (sheet)."""
-        excel_path = "data/quizvragen.xlsx"
-        QuestionBank.import_from_excel(excel_path, sheet_name)
-        self.qbank = QuestionBank("data/questions.json")
-        self.engine = SpacedRepetitionEngine(self.qbank, self.history)
+        # uit geheugen of de schijfcache; alleen opnieuw parsen als de bron gewijzigd is
+        try:
+            qbank = QuestionBank.from_source(EXCEL_PATH, sheet_name)
+        except KeyError:
+            print(f"❌ Tabblad '{sheet_name}' niet gevonden in {EXCEL_PATH}")
+            return
+
+        # engine hergebruiken zolang de bank dezelfde is (arrays blijven geldig)
+        if self.engine is None or self.qbank is not qbank:
+            from engine import SpacedRepetitionEngine  # numpy pas bij de eerste quiz
+
+            self.qbank = qbank
+            self.engine = SpacedRepetitionEngine(self.qbank, self.history)
 
         self.questions = self.engine.select_questions(n=num_questions)
         self.index = 0
         self.results = {"correct": 0, "wrong": 0}
+        self.quiz_view.prefetch(self.questions[:PREFETCH_AHEAD + 1])
 
         self.show_quiz()
 
@@ -63,6 +86,7 @@ class DocQuizApp(tk.Tk):
         self.hide_all()
         self.quiz_view.pack(fill="both", expand=True)
         self.quiz_view.show_question(self.questions[self.index])
+        self.quiz_view.prefetch(self.questions[self.index + 1:self.index + 1 + PREFETCH_AHEAD])
 
     # -----------------------
     def next_question(self, question, answer):
@@ -82,8 +106,9 @@ class DocQuizApp(tk.Tk):
                 correct = False
 
         # Geschiedenis bijwerken
-        self.history.update_question(question.id, correct)
+        self.history.update_question(question.id, correct, latency=self.quiz_view.answer_latency)
         self.history.update_tags(question.tags, correct)
+        self.result_view.record_answer(question.tags, correct)
 
         # Score bijwerken
         if correct:
@@ -104,6 +129,7 @@ class DocQuizApp(tk.Tk):
     # -----------------------
     def show_result(self):
         """Toon resultaten."""
+        self.history.flush()
         self.hide_all()
         self.result_view.pack(fill="both", expand=True)
         self.result_view.show_results(self.results, self.history.data["tag_stats"])
@@ -123,4 +149,6 @@ class DocQuizApp(tk.Tk):
 
 if __name__ == "__main__":
     app = DocQuizApp()
+    startup.mark("eerste venster")
+    app.after_idle(startup.report)
     app.mainloop()
@@ -1,97 +1,114 @@
+from utils import startup
+
+startup.install_profiler()  # DOCQUIZ_IMPORT_PROFILE=1 → importtijden per module
+
 import streamlit as st
-import requests
+from utils.image_cache import get_image_cache
+from utils.question_source import make_source
+import os
 import time
-from datetime import datetime
 from models import HistoryStore
-import random
 
 st.set_page_config(page_title="DocQuiz Web", layout="centered")
 
 # ---------------------------------------------------------
-# JSON met vragen (vanuit GitHub - raw)
+# JSON met vragen (lokaal of vanuit GitHub - raw)
 # ---------------------------------------------------------
-JSON_URL = "https://raw.githubusercontent.com/onomatorHanze/didactic-octo-spork/main/data/questions.json"
+RAW_BASE = "https://raw.githubusercontent.com/onomatorHanze/didactic-octo-spork/main"
+QUESTIONS_TTL = 60  # seconden tussen (conditionele) controles op nieuwe vragen
+QUESTIONS_POLL = 2  # seconden tussen mtime-controles van een lokale bron
+
+
+def setting(name, default=None):
+    """Instelling uit st.secrets, anders uit de omgeving."""
+    try:
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        pass  # geen secrets.toml
+    return os.environ.get(name, default)
+
+
+@st.cache_resource
+def get_source():
+    # één gedeelde bron voor alle sessies: ongewijzigde vakken houden dezelfde
+    # (compacte) Question-objecten, zodat het due-index hergebruikt kan worden.
+    # QUESTIONS_DIR → lokaal (map of JSON-bestand), met QUESTIONS_URL als
+    # fallback als die is ingesteld; anders alleen GitHub.
+    local = setting("QUESTIONS_DIR")
+    remote = setting("QUESTIONS_URL", None if local else RAW_BASE)
+    return make_source(local, remote, ttl=QUESTIONS_TTL, poll=QUESTIONS_POLL)
+
 
+def get_subjects():
+    return get_source().subjects()
 
-@st.cache_data(ttl=60)
-def load_data():
-    r = requests.get(JSON_URL, timeout=5)
-    r.raise_for_status()
-    data = r.json()
-    return data if isinstance(data, dict) else {}
+
+def get_questions(vak):
+    """Vragen van één vak; bij een manifest wordt alleen dat vak opgehaald."""
+    return get_source().questions(vak)
 
 
 def safe_show_image(url: str):
-    if not isinstance(url, str) or not url.strip():
-        return
-    try:
-        r = requests.get(url, timeout=4)
-        if r.status_code == 200:
-            st.image(r.content, use_column_width=True)
-    except:
-        pass
+    content = get_image_cache().get(url)
+    if content:
+        try:
+            st.image(content, use_column_width=True)
+        except Exception:
+            pass
 
 
 # ---------------------------------------------------------
-# SLIMME SELECTIE (Spaced Repetition + Leitner)
+# HISTORY (één instantie per gebruiker per proces)
 # ---------------------------------------------------------
-def smart_select_questions(questions, history: HistoryStore, n=5):
-    """Selecteer vragen via spaced repetition + Leitner boxes."""
-
-    BOX_WAIT = {
-        0: 0,                  # direct opnieuw
-        1: 5 * 60,             # 5 minuten
-        2: 15 * 60,            # 15 minuten
-        3: 60 * 60,            # 1 uur
-        4: 24 * 60 * 60,       # 1 dag
-        5: 3 * 24 * 60 * 60    # 3 dagen
-    }
-
-    now = datetime.now()
-    candidates = []
-
-    for q in questions:
-        qid = q.get("id")
-        h = history.data["history"].get(qid, None)
-
-        if h:
-            box = h.get("box", 0)
-            last = h.get("last")
-            if last:
-                last_dt = datetime.fromisoformat(last)
-                delta = (now - last_dt).total_seconds()
-            else:
-                delta = 999999999
-        else:
-            box = 0
-            delta = 999999999
+HISTORY_TTL = 30  # seconden tussen controles op wijzigingen elders
+
+
+def get_history(user="default"):
+    """
+    Gedeelde HistoryStore: wordt niet bij elke rerun opnieuw van GitHub
+    gedownload, maar alleen herladen als de SHA wijzigt (na HISTORY_TTL).
+    """
+    return HistoryStore.shared(
+        user=user,
+        ttl=HISTORY_TTL,
+        token=st.secrets["GITHUB_TOKEN"],
+        repo_owner=st.secrets["REPO_OWNER"],
+        repo_name=st.secrets["REPO_NAME"],
+        write_behind=True,
+    )
 
-        # ❌ Wachttijd niet verstreken → blokkeer vraag
-        if delta < BOX_WAIT[box]:
-            continue
 
-        # ✔ Prioriteit: slechter beheerde vragen eerder
-        days_ago = delta / 86400
-        priority = (5 - box) * 3 + days_ago
+# ---------------------------------------------------------
+# SLIMME SELECTIE (Spaced Repetition + Leitner) → zie engine.py
+# ---------------------------------------------------------
+@st.cache_resource
+def _due_indexes():
+    return {}
+
 
-        candidates.append((priority, q))
+def get_due_index(history: HistoryStore, vak, questions):
+    """
+    Due-index per (gebruiker, vak), blijft bestaan tussen reruns en wordt
+    via de HistoryStore incrementeel bijgewerkt. Alleen opnieuw opgebouwd
+    als de vragen of de geschiedenis opnieuw geladen zijn.
+    """
+    indexes = _due_indexes()
+    key = (history.user, vak)
+    index = indexes.get(key)
 
-    # Als er te weinig kandidaten zijn → vul aan met willekeur
-    if len(candidates) < n:
-        rest = [q for q in questions if q not in [qq for _, qq in candidates]]
-        random.shuffle(rest)
-        while len(candidates) < n and rest:
-            candidates.append((0, rest.pop()))
+    if index is None or index.stale or index.source is not questions or index.history is not history:
+        from engine import make_due_index  # numpy pas bij de eerste quiz
 
-    candidates.sort(key=lambda x: x[0], reverse=True)
-    return [q for _, q in candidates[:n]]
+        index = make_due_index(questions, history)
+        indexes[key] = index
+    return index
 
 
 # ---------------------------------------------------------
 # STARTSCHERM
 # ---------------------------------------------------------
-data = load_data()
-vakken = sorted(data.keys())
+vakken = get_subjects()
 
 st.title("📘 DocQuiz Web")
 st.markdown("Oefen je kennis per vak via een slimme quiz.")
@@ -103,28 +120,32 @@ if not vakken:
 vak = st.selectbox("Kies een vak:", vakken)
 num_questions = st.number_input("Aantal vragen:", 1, 50, 5)
 
+startup.mark("startscherm")
+startup.report()  # alleen de eerste keer per proces, en alleen met de profiler
+
 if st.button("Start quiz"):
-    questions_all = data.get(vak, [])
+    questions_all = get_questions(vak)
 
-    # HistoryStore via GitHub
-    history = HistoryStore(
-        user="default",
-        token=st.secrets["GITHUB_TOKEN"],
-        repo_owner=st.secrets["REPO_OWNER"],
-        repo_name=st.secrets["REPO_NAME"],
-    )
+    # HistoryStore via GitHub (gedeeld, niet per rerun opnieuw laden)
+    history = get_history()
 
     # ✔ Slim algoritme
+    from engine import smart_select_questions
+
     questions = smart_select_questions(
         questions_all,
         history,
-        int(num_questions)
+        int(num_questions),
+        index=get_due_index(history, vak, questions_all),
     )
 
     st.session_state["questions"] = questions
     st.session_state["vak"] = vak
     st.session_state["index"] = 0
     st.session_state["score"] = {"correct": 0, "wrong": 0}
+    # toontijden van de vorige quiz wissen (anders klopt de bedenktijd niet)
+    for key in [k for k in st.session_state if str(k).startswith("shown_")]:
+        del st.session_state[key]
     st.rerun()
 
 
@@ -137,22 +158,19 @@ if "questions" in st.session_state and st.session_state["questions"]:
     i = st.session_state["index"]
 
     # HistoryStore ook hier beschikbaar
-    history = HistoryStore(
-        user="default",
-        token=st.secrets["GITHUB_TOKEN"],
-        repo_owner=st.secrets["REPO_OWNER"],
-        repo_name=st.secrets["REPO_NAME"],
-    )
+    history = get_history()
 
     # EINDE
     if i >= len(qs):
         st.balloons()
+        history.flush()  # sessie klaar → openstaande antwoorden wegschrijven
         st.success("🎉 **Klaar!**")
         st.metric("Goed", st.session_state["score"]["correct"])
         st.metric("Fout", st.session_state["score"]["wrong"])
         st.stop()
 
     q = qs[i]
+    shown_at = st.session_state.setdefault(f"shown_{i}", time.time())  # voor bedenktijd
     st.progress((i + 1) / len(qs))
     st.subheader(f"({st.session_state['vak']}) Vraag {i+1}")
     st.markdown(q.get("text", ""), unsafe_allow_html=True)
@@ -188,7 +206,7 @@ if "questions" in st.session_state and st.session_state["questions"]:
                 st.session_state["score"]["wrong"] += 1
 
             # Update geschiedenis op GitHub
-            history.update_question(q["id"], correct)
+            history.update_question(q["id"], correct, latency=time.time() - shown_at)
 
             time.sleep(1)
             st.session_state["index"] += 1
@@ -212,7 +230,7 @@ if "questions" in st.session_state and st.session_state["questions"]:
                 st.session_state["score"]["wrong"] += 1
 
             # Update geschiedenis op GitHub
-            history.update_question(q["id"], is_correct)
+            history.update_question(q["id"], is_correct, latency=time.time() - shown_at)
 
             time.sleep(1)
             st.session_state["index"] += 1
@@ -237,7 +255,7 @@ if "questions" in st.session_state and st.session_state["questions"]:
                 st.session_state["score"]["wrong"] += 1
 
             # Update geschiedenis op GitHub
-            history.update_question(q["id"], is_correct)
+            history.update_question(q["id"], is_correct, latency=time.time() - shown_at)
 
             time.sleep(1)
             st.session_state["index"] += 1
@@ -1,8 +1,187 @@
+import heapq
 import random
+import threading
 import time
 from datetime import datetime, timedelta
+from operator import itemgetter
+import numpy as np
 from models import QuestionBank, HistoryStore
 
+
+class DueIndex:
+    """
+    Index op 'wanneer is een vraag weer aan de beurt' (Leitner-boxen).
+
+    Per box staat een heap met (laatste antwoord, positie, qid): binnen één box is
+    de oudste vraag zowel als eerste 'due' als het meest urgent. De top-k
+    due vragen zijn dus een k-way merge over de boxen; dat kost
+    O(k log n) in plaats van een scan over de hele bank.
+
+    Prioriteit (gelijk aan smart_select_questions):
+        (MAX_BOX - box) * 3 + dagen sinds laatste antwoord
+    Nooit beantwoorde vragen zijn altijd due en komen eerst.
+
+    Het index houdt zichzelf bij via HistoryStore.add_listener.
+    """
+
+    NEVER = 999999999  # seconden 'geleden' voor vragen zonder tijdstip
+
+    def __init__(self, items, history, waits, key=lambda q: q.id):
+        self.source = items
+        self.history = history
+        self.waits = list(waits)          # wachttijd per box in seconden
+        self.max_box = len(self.waits) - 1
+        self.stale = False
+
+        self._lock = threading.Lock()
+        self._items = {}                  # qid -> vraag
+        for item in items:
+            self._items.setdefault(key(item), item)
+        self._keys = list(self._items)
+        self._pos = {qid: i for i, qid in enumerate(self._keys)}   # gelijke prioriteit → volgorde van de bank
+
+        self._build()
+        history.add_listener(self._on_update)
+
+    def _build(self):
+        self._unseen = {}                 # qid -> None (volgorde van de bank)
+        self._state = {}                  # qid -> (box, last_ts)
+        self._heaps = [[] for _ in self.waits]
+        self._size = 0
+
+        hist = self.history.data["history"]
+        for qid in self._items:
+            h = hist.get(qid)
+            if h and (h.get("last") or h.get("box", 0)):
+                self._set(qid, h, push=list.append)
+            else:
+                self._unseen[qid] = None   # zelfde prioriteit als nooit beantwoord
+
+        for heap in self._heaps:
+            heapq.heapify(heap)
+
+    def _set(self, qid, h, push=heapq.heappush):
+        box = min(max(int(h.get("box", 0)), 0), self.max_box)
+        last = h.get("last")
+        last_ts = datetime.fromisoformat(last).timestamp() if last else float("-inf")
+
+        self._state[qid] = (box, last_ts)
+        push(self._heaps[box], (last_ts, self._pos[qid], qid))
+        self._size += 1
+
+    def _on_update(self, qid, hist):
+        if qid is None:
+            self.stale = True             # alles herladen → opnieuw opbouwen
+            return
+        if qid not in self._items:
+            return
+
+        with self._lock:
+            self._unseen.pop(qid, None)
+            self._set(qid, hist)
+
+            # verouderde heap-items opruimen als ze de overhand krijgen
+            if self._size > 2 * len(self._state) + 64:
+                self._build()
+
+    def _priority(self, box, last_ts, now):
+        return (self.max_box - box) * 3 + min(now - last_ts, self.NEVER) / 86400
+
+    def top(self, k, now=None):
+        """De k meest urgente due vragen, hoogste prioriteit eerst."""
+        now = now if now is not None else datetime.now().timestamp()
+
+        with self._lock:
+            result = []
+            for qid in self._unseen:
+                if len(result) >= k:
+                    break
+                result.append(qid)
+
+            merge = []
+            popped = []
+
+            def push_head(box):
+                heap = self._heaps[box]
+                while heap:
+                    last_ts, pos, qid = heap[0]
+                    if self._state.get(qid) != (box, last_ts):
+                        heapq.heappop(heap)   # verouderd item
+                        self._size -= 1
+                        continue
+                    if now - last_ts >= self.waits[box]:
+                        heapq.heappush(merge, (-self._priority(box, last_ts, now), pos, box))
+                    return
+
+            for box in range(len(self._heaps)):
+                push_head(box)
+
+            while merge and len(result) < k:
+                _, _, box = heapq.heappop(merge)
+                entry = heapq.heappop(self._heaps[box])
+                popped.append((box, entry))
+                result.append(entry[2])
+                push_head(box)
+
+            for box, entry in popped:
+                heapq.heappush(self._heaps[box], entry)
+
+        return [self._items[qid] for qid in result]
+
+    def fill(self, k, exclude=()):
+        """k willekeurige andere vragen (aanvulling als er te weinig due zijn)."""
+        taken = set(exclude)
+        available = len(self._keys) - len(taken)
+        k = min(k, max(available, 0))
+
+        if k * 2 >= available:
+            rest = [qid for qid in self._keys if qid not in taken]
+            return [self._items[qid] for qid in random.sample(rest, k)]
+
+        result = []
+        while len(result) < k:
+            qid = random.choice(self._keys)
+            if qid not in taken:
+                taken.add(qid)
+                result.append(self._items[qid])
+        return result
+
+
+class WeightedSampler:
+    """
+    Gewogen steekproef ZONDER teruglegging (Efraimidis–Spirakis).
+
+    Elk item krijgt sleutel log(u) / w met u uniform in (0, 1]; de k items
+    met de grootste sleutels vormen de steekproef. Kosten O(n + k log k)
+    via argpartition. De sampler kan hergebruikt worden zolang de gewichten
+    niet veranderen; met `seed` is de uitkomst reproduceerbaar.
+    """
+
+    def __init__(self, items, weights, seed=None, rng=None):
+        self.items = items
+        self.weights = np.asarray(weights, dtype=float)
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+        valid = self.weights > 0
+        self._valid = valid
+        self._count = int(valid.sum())
+        self._inv = np.zeros_like(self.weights)
+        self._inv[valid] = 1.0 / self.weights[valid]
+
+    def sample(self, k):
+        k = min(k, self._count)
+        if k <= 0:
+            return []
+
+        u = 1.0 - self.rng.random(len(self.weights))   # (0, 1]
+        keys = np.log(u) * self._inv
+        keys[~self._valid] = -np.inf                    # gewicht 0 → nooit kiezen
+
+        top = np.argpartition(-keys, k - 1)[:k]
+        top = top[np.argsort(-keys[top])]
+        return [self.items[i] for i in top]
+
+
 class SpacedRepetitionEngine:
     """
     Deze klasse kiest vragen op basis van voortgang (Leitner-principe).
@@ -17,9 +196,19 @@ class SpacedRepetitionEngine:
         timedelta(days=21)
     ]
 
-    def __init__(self, qbank: QuestionBank, history: HistoryStore):
+    def __init__(self, qbank: QuestionBank, history: HistoryStore, seed=None):
         self.qbank = qbank
         self.history = history
+        self.rng = np.random.default_rng(seed)
+        self._sampler = None
+        self._sampler_tags = None
+
+        # Geschiedenis als NumPy-arrays (één rij per vraag in de bank),
+        # pas opgebouwd bij de eerste selectie en daarna incrementeel bijgewerkt
+        self._arrays_ready = False
+        self.history.add_listener(self._on_history_update)
+
+        self._due_index = None
 
     def _calc_weight(self, q):
         """
@@ -47,15 +236,193 @@ class SpacedRepetitionEngine:
             base *= 1.5
 
         return base
-    
-    
-    
+
+    # ---------------------------------------------------------
+    # Gevectoriseerde variant: alle gewichten in één keer
+    # ---------------------------------------------------------
+    def _build_arrays(self):
+        questions = self.qbank.questions
+        n = len(questions)
+
+        self._pos = {id(q): i for i, q in enumerate(questions)}
+        self._rows = {}
+        for i, q in enumerate(questions):
+            self._rows.setdefault(q.id, []).append(i)
+
+        self._difficulty = np.array([q.difficulty for q in questions], dtype=float)
+        self._seen = np.zeros(n, dtype=bool)
+        self._box = np.zeros(n, dtype=np.int8)
+        self._correct = np.zeros(n, dtype=np.int32)
+        self._wrong = np.zeros(n, dtype=np.int32)
+        self._last = np.zeros(n, dtype=float)   # epoch-seconden
+
+        self._wait = np.array([w.total_seconds() for w in self.BOX_WAIT])
+
+        for qid, h in self.history.data["history"].items():
+            self._set_rows(qid, h)
+        self._arrays_ready = True
+
+    def _set_rows(self, qid, h):
+        rows = self._rows.get(qid)
+        if not rows or not h:
+            return
+        last = h.get("last")
+        for i in rows:
+            self._seen[i] = True
+            self._box[i] = h["box"]
+            self._correct[i] = h["correct"]
+            self._wrong[i] = h["wrong"]
+            self._last[i] = datetime.fromisoformat(last).timestamp() if last else -np.inf
+
+    def _on_history_update(self, qid, hist):
+        if not self._arrays_ready:
+            return
+        if qid is None:
+            self._arrays_ready = False   # alles herladen → volgende keer opnieuw opbouwen
+        else:
+            self._set_rows(qid, hist)
+
+    def _calc_weights(self, candidates=None):
+        """
+        Gewichten voor `candidates` (standaard de hele bank) in één
+        gevectoriseerde stap, met één gezamenlijk 'nu'.
+        Geeft dezelfde uitkomst als _calc_weight per vraag.
+        """
+        if not self._arrays_ready:
+            self._build_arrays()
+
+        if candidates is None:
+            idx = slice(None)
+        else:
+            idx = np.fromiter((self._pos[id(q)] for q in candidates), dtype=np.intp, count=len(candidates))
+
+        base = 1 + 0.2 * self._difficulty[idx]
+        box = self._box[idx]
+        now = datetime.now().timestamp()
+
+        overdue = (now - self._last[idx]) > self._wait[box]
+        weak = self._wrong[idx] > self._correct[idx]
+
+        seen_weight = np.where(overdue, 2.0, 1.0) * np.where(weak, 1.5, 1.0)
+        return base * np.where(self._seen[idx], seen_weight, 3.0)
+
+
+
+    # ---------------------------------------------------------
+    # Due-index: alleen de vragen die aan de beurt zijn
+    # ---------------------------------------------------------
+    @property
+    def due_index(self):
+        if self._due_index is None or self._due_index.stale:
+            waits = [w.total_seconds() for w in self.BOX_WAIT]
+            self._due_index = DueIndex(self.qbank.questions, self.history, waits)
+        return self._due_index
+
+    def select_due(self, n=5):
+        """
+        De n meest urgente due vragen (aangevuld met willekeurige als er te
+        weinig zijn). Kosten hangen af van n, niet van de grootte van de bank.
+        """
+        chosen = self.due_index.top(n)
+        if len(chosen) < n:
+            chosen += self.due_index.fill(n - len(chosen), exclude=[q.id for q in chosen])
+        return chosen
+
     def select_questions(self, n=5, tags=None):
         """
-        Selecteer n vragen met weging.
+        Selecteer n verschillende vragen.
+
+        Zonder tags via de due-index (select_due): de meest urgente vragen,
+        zonder scan over de bank. Met tags een gewogen steekproef (zonder
+        teruglegging) uit alleen de vragen met die tags.
         """
+        if not tags:
+            return self.select_due(n)
+
         candidates = self.qbank.filter(tags=tags)
-        weights = [self._calc_weight(q) for q in candidates]
-        print("DEBUG candidates type:", type(candidates), "len attr:", getattr(candidates, "len", None))
-        print("DEBUG min is:", min, "type:", type(min))
-        return random.choices(candidates, weights=weights, k=min(n, len(candidates)))
+        weights = self._calc_weights(candidates)
+
+        # sampler hergebruiken als kandidaten en gewichten gelijk zijn gebleven
+        key = tuple(tags) if tags else None
+        sampler = self._sampler
+        if sampler is None or self._sampler_tags != key or not np.array_equal(sampler.weights, weights):
+            sampler = WeightedSampler(candidates, weights, rng=self.rng)
+            self._sampler = sampler
+            self._sampler_tags = key
+
+        return sampler.sample(n)
+
+
+# ------------------------------------------------------------
+# Slimme selectie voor de Streamlit-app (vragen als dicts)
+# ------------------------------------------------------------
+SMART_BOX_WAIT = {
+    0: 0,                  # direct opnieuw
+    1: 5 * 60,             # 5 minuten
+    2: 15 * 60,            # 15 minuten
+    3: 60 * 60,            # 1 uur
+    4: 24 * 60 * 60,       # 1 dag
+    5: 3 * 24 * 60 * 60    # 3 dagen
+}
+
+
+def make_due_index(questions, history: HistoryStore):
+    """DueIndex over vraag-dicts met de wachttijden van SMART_BOX_WAIT."""
+    waits = [SMART_BOX_WAIT[box] for box in sorted(SMART_BOX_WAIT)]
+    return DueIndex(questions, history, waits, key=lambda q: q.get("id"))
+
+
+def smart_select_questions(questions, history: HistoryStore, n=5, index=None):
+    """
+    Selecteer vragen via spaced repetition + Leitner boxes.
+
+    Met een DueIndex (zie make_due_index) kost dit O(n log N); zonder
+    index één lineaire scan met top-n via heapq.nlargest.
+    """
+    if index is not None:
+        # alleen de n meest urgente vragen uit het index, geen scan over alles
+        chosen = index.top(n)
+        if len(chosen) < n:
+            chosen += index.fill(n - len(chosen), exclude=[q.get("id") for q in chosen])
+        return chosen
+
+    now = datetime.now()
+    hist = history.data["history"]
+    candidates = []   # (prioriteit, positie)
+
+    for pos, q in enumerate(questions):
+        h = hist.get(q.get("id"))
+
+        if h:
+            box = h.get("box", 0)
+            last = h.get("last")
+            if last:
+                last_dt = datetime.fromisoformat(last)
+                delta = (now - last_dt).total_seconds()
+            else:
+                delta = 999999999
+        else:
+            box = 0
+            delta = 999999999
+
+        # ❌ Wachttijd niet verstreken → blokkeer vraag
+        if delta < SMART_BOX_WAIT[box]:
+            continue
+
+        # ✔ Prioriteit: slechter beheerde vragen eerder
+        days_ago = delta / 86400
+        priority = (5 - box) * 3 + days_ago
+
+        candidates.append((priority, pos))
+
+    # alleen de n besten nodig → geen volledige sort
+    top = heapq.nlargest(n, candidates, key=itemgetter(0))
+    chosen = [questions[pos] for _, pos in top]
+
+    # Als er te weinig kandidaten zijn → vul aan met willekeur
+    if len(chosen) < n:
+        taken = {q.get("id") for q in chosen}
+        rest = list({q.get("id"): q for q in questions if q.get("id") not in taken}.values())
+        chosen += random.sample(rest, min(n - len(chosen), len(rest)))
+
+    return chosen
@@ -1,18 +1,53 @@
 import json
 import os
-import csv
-import ast
+import pickle
+import re
+import sys
+import hashlib
+import atexit
+import bisect
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from array import array
 from datetime import datetime
 from builtins import min
-import pandas as pd
-import base64
-import requests
+from utils import importers
+from utils.storage import ConflictError, GitHubBackend, JSONFileBackend
 
 
 # ------------------------------------------------------------
 # 1️⃣ Klasse voor één quizvraag
 # ------------------------------------------------------------
+_TAG_SETS = {}  # gedeelde (geïnterneerde) tag-tuples
+
+
+def _intern_tags(tags):
+    key = tuple(sys.intern(str(t)) for t in tags or ())
+    return _TAG_SETS.setdefault(key, key)
+
+
 class Question:
+    """
+    Compacte vraag: vaste velden in __slots__ (geen __dict__ per vraag),
+    topic/type/tags geïnterneerd zodat duizenden vragen dezelfde strings
+    delen. Grote velden (choices, explanation en onbekende extra velden)
+    staan als één JSON-blob en worden pas bij het tonen gedecodeerd.
+
+    Ondersteunt ook q.get("veld") / q["veld"], zodat code die met de
+    vraag-dicts uit questions.json werkt ongewijzigd blijft.
+    """
+
+    __slots__ = (
+        "id", "type", "topic", "text", "tags", "answer", "answer_numeric",
+        "tolerance", "image_path", "image_url", "formula_latex", "difficulty",
+        "_details",
+    )
+
+    COMPRESS_MIN = 160  # kleinere blobs niet comprimeren (zlib-header kost ook)
+
     def __init__(
         self,
         id,
@@ -27,21 +62,99 @@ class Question:
         explanation=None,
         image_path=None,
         formula_latex=None,
-        difficulty=2
+        difficulty=2,
+        image_url=None,
+        **extra
     ):
         self.id = id
-        self.type = type
-        self.topic = topic
+        self.type = sys.intern(type) if isinstance(type, str) else type
+        self.topic = sys.intern(topic) if isinstance(topic, str) else topic
         self.text = text
-        self.tags = tags or []
-        self.choices = choices or []
+        self.tags = _intern_tags(tags)
         self.answer = answer
         self.answer_numeric = answer_numeric
         self.tolerance = tolerance
-        self.explanation = explanation
         self.image_path = image_path
+        self.image_url = image_url
         self.formula_latex = formula_latex
         self.difficulty = difficulty
+        self._details = None
+        self._pack(choices=choices or [], explanation=explanation, **extra)
+
+    @classmethod
+    def from_dict(cls, d):
+        """Vraag uit een dict van questions.json (ontbrekende velden leeg)."""
+        d = dict(d)
+        return cls(
+            d.pop("id", None), d.pop("type", None), d.pop("topic", ""), d.pop("text", ""), **d
+        )
+
+    # ---- grote velden: pas decoderen bij gebruik ----
+    def _pack(self, **fields):
+        details = self._unpack()
+        details.update(fields)
+        details = {k: v for k, v in details.items() if v not in (None, [], "")}
+        if not details:
+            self._details = None
+            return
+        blob = json.dumps(details, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(blob) > self.COMPRESS_MIN:
+            packed = zlib.compress(blob, 6)
+            if len(packed) < len(blob):
+                blob = packed
+        self._details = blob
+
+    def _unpack(self):
+        blob = self._details
+        if not blob:
+            return {}
+        if blob[:1] != b"{":  # zlib-gecomprimeerd
+            blob = zlib.decompress(blob)
+        return json.loads(blob)
+
+    @property
+    def choices(self):
+        return self._unpack().get("choices", [])
+
+    @choices.setter
+    def choices(self, value):
+        self._pack(choices=value or [])
+
+    @property
+    def explanation(self):
+        return self._unpack().get("explanation")
+
+    @explanation.setter
+    def explanation(self, value):
+        self._pack(explanation=value)
+
+    # ---- dict-compatibel (Streamlit-app, engine) ----
+    def get(self, key, default=None):
+        if key in self.__slots__ and not key.startswith("_"):
+            value = getattr(self, key)
+            return default if value is None else value
+        return self._unpack().get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in self.__slots__ if not k.startswith("_")}
+        d["tags"] = list(self.tags)
+        d.update(self._unpack())
+        return d
+
+    def __repr__(self):
+        return f"Question({self.id!r}, {self.type!r}, {self.topic!r})"
+
+
+_MISSING = object()
 
 
 # ------------------------------------------------------------
@@ -53,44 +166,279 @@ class QuestionBank:
     Alleen handig voor bulk-import van CSV of Excel.
     """
 
+    CACHE_DIR = "data/cache"
+    CACHE_VERSION = 3  # verhogen als Question of de index van vorm verandert
+
     def __init__(self, path="data/questions.json"):
         if not os.path.exists(path):
             raise FileNotFoundError(f"Bestand niet gevonden: {path}")
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
         self.questions = [Question(**q) for q in data.get("questions", [])]
+        self._build_index()
+
+    @classmethod
+    def from_questions(cls, questions):
+        """Bank uit vraag-dicts, zonder bestand."""
+        qbank = cls.__new__(cls)
+        qbank.questions = [Question.from_dict(q) for q in questions]
+        qbank._build_index()
+        return qbank
+
+    # ---- gecompileerde cache (pickle incl. index) ----
+    _loaded = {}  # (pad, variant) → ((mtime_ns, size), QuestionBank of {tabblad: QuestionBank})
+    _loaded_lock = threading.Lock()
+
+    @classmethod
+    def from_source(cls, path, sheet_name=None, cache_dir=None):
+        """
+        Bank uit JSON, CSV of Excel via een gecompileerde cache op schijf.
+
+        De cache (pickle van de vragen + prebuilt index) heeft als sleutel de
+        content-hash van het bronbestand; alleen als de bron verandert wordt
+        opnieuw geparsed. Een kapotte of verouderde cache wordt genegeerd.
+        Bij Excel wordt de hele werkmap in één keer omgezet (load_workbook).
+        Zolang mtime/grootte gelijk blijven, komt dezelfde bank uit het
+        geheugen terug (geen hash, geen pickle).
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".xls":
+            # de streaming-import leest alleen OOXML (openpyxl)
+            raise ValueError(f"{path}: het oude .xls-formaat wordt niet ondersteund, sla op als .xlsx")
+        if ext in (".xlsx", ".xlsm"):
+            return cls.load_workbook(path, cache_dir)[sheet_name if sheet_name is not None else "DC"]
+
+        return cls._memo(
+            path, sheet_name, cache_dir,
+            lambda raw: cls.from_questions(cls._read_source(path, raw, sheet_name)),
+        )
+
+    @classmethod
+    def load_workbook(cls, path, cache_dir=None):
+        """
+        Alle tabbladen van een Excel-werkmap als {tabblad: QuestionBank}.
+
+        In het geheugen bewaard zolang mtime/grootte niet veranderen (geen
+        hash nodig); daarna via de schijfcache op content-hash. Alleen een
+        gewijzigde werkmap wordt opnieuw (in één keer) geparsed.
+        """
+        return cls._memo(
+            path, "*", cache_dir,
+            lambda raw: {
+                sheet: cls.from_questions(questions)
+                for sheet, questions in cls._read_workbook(path).items()
+            },
+        )
+
+    @classmethod
+    def _memo(cls, path, variant, cache_dir, build):
+        """_cached met daarvoor een geheugencache op (mtime, grootte) van de bron."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Bestand niet gevonden: {path}")
+        st = os.stat(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+
+        with cls._loaded_lock:
+            hit = cls._loaded.get((path, variant))
+            if hit and hit[0] == stat_key:
+                return hit[1]
+
+            result = cls._cached(path, variant, cache_dir, build)
+            cls._loaded[(path, variant)] = (stat_key, result)
+            return result
+
+    @classmethod
+    def _cached(cls, path, variant, cache_dir, build):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Bestand niet gevonden: {path}")
+        cache_dir = cache_dir or cls.CACHE_DIR
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw)
+        digest.update(f"|{variant}|{cls.CACHE_VERSION}".encode("utf-8"))
+
+        # stam = leesbare naam + hash van (absoluut pad, variant): bronnen met
+        # dezelfde bestandsnaam of een variant als voorvoegsel botsen niet
+        stem = os.path.basename(path).replace(".", "_")
+        if variant is not None:
+            stem += "-" + re.sub(r"[^A-Za-z0-9_]+", "_", str(variant))
+        source = f"{os.path.abspath(path)}\x00{'' if variant is None else variant}"
+        stem += "-" + hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+        cache_path = os.path.join(cache_dir, f"{stem}-{digest.hexdigest()[:20]}.bank")
+
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    return pickle.load(f)
+            except Exception as e:
+                print(f"⚠️ Cache {cache_path} onleesbaar, opnieuw opbouwen: {e}")
+
+        result = build(raw)
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{cache_path}.{uuid.uuid4().hex[:6]}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+
+            # oudere caches van precies deze bron + variant opruimen
+            own = re.compile(re.escape(stem) + r"-[0-9a-f]{20}\.bank")
+            for name in os.listdir(cache_dir):
+                if own.fullmatch(name) and name != os.path.basename(cache_path):
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError as e:
+            print(f"⚠️ Kon cache niet schrijven: {e}")
 
-    def filter(self, topics=None, tags=None):
-        result = self.questions
-        if topics:
-            result = [q for q in result if q.topic in topics]
-        if tags:
-            result = [q for q in result if any(t in q.tags for t in tags)]
         return result
 
-    # ---- CSV import ----
+    @classmethod
+    def _read_source(cls, path, raw, sheet_name=None):
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            return cls._read_csv(path)
+
+        data = json.loads(raw.decode("utf-8"))
+        if isinstance(data, list):
+            return data
+        if "questions" in data:
+            return data["questions"]
+        # vraag-JSON per vak: één vak, of alle vakken achter elkaar
+        if sheet_name is not None:
+            return data.get(sheet_name, [])
+        return [q for qs in data.values() if isinstance(qs, list) for q in qs]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_filter_cache"] = {}  # filterresultaten niet meebewaren
+        return state
+
+    # ---- index: tag/topic/difficulty → posities van vragen ----
+    DENSE_FRACTION = 32  # key in ≥ 1/32 van de vragen: bitset is kleiner dan een positielijst
+
+    def _entry(self, positions, n):
+        """Gesorteerde positielijst, of een bitset (int) voor veelvoorkomende keys."""
+        if len(positions) * self.DENSE_FRACTION < n:
+            return array("I", positions)
+        bits = bytearray((n + 7) // 8)
+        for i in positions:
+            bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, "little")
+
+    def _build_index(self):
+        by_tag, by_topic, by_difficulty = {}, {}, {}
+        for i, q in enumerate(self.questions):
+            by_topic.setdefault(q.topic, []).append(i)
+            by_difficulty.setdefault(q.difficulty, []).append(i)
+            for t in set(q.tags):
+                by_tag.setdefault(t, []).append(i)
+
+        n = len(self.questions)
+        self._by_tag = {k: self._entry(v, n) for k, v in by_tag.items()}
+        self._by_topic = {k: self._entry(v, n) for k, v in by_topic.items()}
+        self._by_difficulty = {k: self._entry(v, n) for k, v in by_difficulty.items()}
+        self._filter_cache = {}
+
+    @staticmethod
+    def _count(entry):
+        return entry.bit_count() if isinstance(entry, int) else len(entry)
+
+    @staticmethod
+    def _contains(entry, i):
+        if isinstance(entry, int):
+            return entry >> i & 1
+        j = bisect.bisect_left(entry, i)
+        return j < len(entry) and entry[j] == i
+
+    @staticmethod
+    def _positions(entry):
+        if not isinstance(entry, int):
+            return entry
+        out = []
+        while entry:
+            low = entry & -entry   # laagste gezette bit
+            out.append(low.bit_length() - 1)
+            entry ^= low
+        return out
+
+    def filter(self, topics=None, tags=None, all_tags=None,
+               exclude_tags=None, exclude_topics=None, difficulty=None):
+        """
+        Filter de bank via de tag/topic-indexen. Alle opgegeven voorwaarden
+        moeten gelden (AND):
+          topics         – één van deze topics (OR)
+          tags           – minstens één van deze tags (OR)
+          all_tags       – al deze tags (AND)
+          exclude_tags   – geen van deze tags (NOT)
+          exclude_topics – geen van deze topics (NOT)
+          difficulty     – (min, max), grenzen inclusief
+        Resultaten worden per combinatie gecachet.
+        """
+        def norm(v):
+            if not v:
+                return None
+            return frozenset([v] if isinstance(v, str) else v)
+
+        key = (norm(topics), norm(tags), norm(all_tags),
+               norm(exclude_tags), norm(exclude_topics),
+               tuple(difficulty) if difficulty else None)
+
+        cached = self._filter_cache.get(key)
+        if cached is None:
+            topics, tags, all_tags, exclude_tags, exclude_topics, difficulty = key
+
+            # elke groep: minstens één van de entries moet de vraag bevatten
+            groups = []
+            if topics:
+                groups.append([self._by_topic.get(k, ()) for k in topics])
+            if tags:
+                groups.append([self._by_tag.get(k, ()) for k in tags])
+            for t in all_tags or ():
+                groups.append([self._by_tag.get(t, ())])
+            if difficulty:
+                lo, hi = difficulty
+                groups.append([e for d, e in self._by_difficulty.items() if lo <= d <= hi])
+            excluded = [self._by_tag[k] for k in exclude_tags or () if k in self._by_tag]
+            excluded += [self._by_topic[k] for k in exclude_topics or () if k in self._by_topic]
+
+            # beginnen bij de kleinste groep, de rest alleen als lidmaatschapstest
+            groups.sort(key=lambda g: sum(self._count(e) for e in g))
+            if groups:
+                first, rest = groups[0], groups[1:]
+                if len(first) == 1:
+                    candidates = self._positions(first[0])
+                else:
+                    candidates = sorted({i for e in first for i in self._positions(e)})
+            else:
+                candidates, rest = range(len(self.questions)), []
+
+            cached = [
+                self.questions[i] for i in candidates
+                if all(any(self._contains(e, i) for e in g) for g in rest)
+                and not any(self._contains(e, i) for e in excluded)
+            ]
+            self._filter_cache[key] = cached
+
+        return list(cached)
+
+    # ---- CSV import (streaming, zie utils/importers.py) ----
+    @staticmethod
+    def _report(source, report):
+        for e in report.errors:
+            print(f"⚠️ {source}: {e}")
+
+    @staticmethod
+    def _read_csv(csv_path):
+        report = importers.ImportReport()
+        questions = list(importers.read_csv(csv_path, report))
+        QuestionBank._report(csv_path, report)
+        return questions
+
     @staticmethod
     def import_from_csv(csv_path: str, json_path: str = "data/questions.json"):
-        questions = []
         try:
-            with open(csv_path, newline='', encoding="utf-8") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-
-                    q = {
-                        "id": row["id"],
-                        "type": row["type"],
-                        "topic": row["topic"],
-                        "text": row["text"],
-                        "difficulty": int(row.get("difficulty", 1)),
-                        "choices": ast.literal_eval(row["choices"]) if row["choices"] else [],
-                        "answer": ast.literal_eval(row["answer"]) if row["answer"] else None,
-                        "explanation": row.get("explanation", ""),
-                        "image_path": row.get("image_path", ""),
-                        "formula_latex": row.get("formula_latex", ""),
-                        "tags": ast.literal_eval(row["tags"]) if row["tags"] else [],
-                    }
-                    questions.append(q)
+            questions = QuestionBank._read_csv(csv_path)
 
             data = {"meta": {"title": "Imported from CSV"}, "questions": questions}
 
@@ -103,37 +451,26 @@ class QuestionBank:
             print(f"❌ CSV importfout: {e}")
 
     # ---- Excel import ----
+    @staticmethod
+    def _read_excel(excel_path, sheet_name="DC"):
+        report = importers.ImportReport()
+        questions = list(importers.read_excel(excel_path, sheet_name, report))
+        QuestionBank._report(f"{excel_path} [{sheet_name}]", report)
+        return questions
+
+    @staticmethod
+    def _read_workbook(excel_path):
+        """Alle tabbladen in één keer: {tabblad: [vraag-dicts]}."""
+        result = {}
+        for sheet, (questions, report) in importers.read_workbook(excel_path).items():
+            QuestionBank._report(f"{excel_path} [{sheet}]", report)
+            result[sheet] = questions
+        return result
+
     @staticmethod
     def import_from_excel(excel_path: str, sheet_name: str = "DC", json_path: str = "data/questions.json"):
         try:
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
-            questions = []
-
-            for _, row in df.iterrows():
-
-                q = {
-                    "id": str(row["id"]),
-                    "type": row["type"],
-                    "topic": row["topic"],
-                    "text": row["text"],
-                    "choices": ast.literal_eval(str(row["choices"])) if pd.notna(row["choices"]) else [],
-                    "answer": ast.literal_eval(str(row["answer"])) if pd.notna(row["answer"]) else None,
-                    "explanation": row.get("explanation", ""),
-                    "image_path": row.get("image_path", ""),
-                    "formula_latex": row.get("formula_latex", ""),
-                    "tags": ast.literal_eval(str(row["tags"])) if pd.notna(row["tags"]) else [],
-                    "difficulty": int(row.get("difficulty", 1)),
-                }
-
-                if q["type"] == "input":
-                    try:
-                        q["answer_numeric"] = float(q["answer"])
-                    except:
-                        q["answer_numeric"] = None
-                else:
-                    q["answer_numeric"] = None
-
-                questions.append(q)
+            questions = QuestionBank._read_excel(excel_path, sheet_name)
 
             data = {"meta": {"source": excel_path}, "questions": questions}
 
@@ -147,84 +484,503 @@ class QuestionBank:
 
 
 # ------------------------------------------------------------
-# 3️⃣ HistoryStore – GitHub versie (GEHEEL VERBETERD)
+# 3️⃣ HistoryStore – opslag via verwisselbare backend
 # ------------------------------------------------------------
 class HistoryStore:
     """
-    Geschiedenis van beantwoorde vragen wordt opgeslagen in GitHub.
-    Pad: data/history/<user>.json
+    Geschiedenis van beantwoorde vragen per gebruiker.
+
+    Bron van waarheid is een append-only event-log: elk antwoord wordt als
+    één record {seq, id, user, ts, qid, correct, latency} toegevoegd (O(1)).
+    De snapshot {history, tag_stats} die de engines lezen wordt daaruit
+    opgebouwd en elke `compact_every` events opnieuw weggeschreven
+    (`compact()`); het log zelf blijft bewaard voor analyse.
+
+    De opslag loopt via een backend uit utils.storage (JSON-bestand,
+    SQLite of GitHub). Zonder expliciete backend wordt GitHub gebruikt
+    als de configuratie aanwezig is (data/history/<user>.json), anders
+    een lokaal JSON-bestand. Optioneel is `remote` een tweede backend
+    (meestal GitHub) waar de gegevens periodiek naartoe gesynchroniseerd
+    worden (`sync_interval` seconden, en bij `flush()`). Andere instanties
+    (web-app, andere pc) kunnen dezelfde remote beschrijven: sync voegt
+    eerst samen met wat daar intussen bijgekomen is en slaat voorwaardelijk op.
+
+    Met write_behind=True worden antwoorden eerst lokaal verzameld en als
+    één commit weggeschreven: na `flush_every` antwoorden, na
+    `flush_interval` seconden, bij afsluiten of via `flush()`.
+    Openstaande antwoorden staan in een lokaal journal zodat ze een
+    crash/herstart overleven.
     """
 
+    JOURNAL_DIR = "data/history/.journal"
+    SYNC_ATTEMPTS = 3   # samenvoegen + opslaan opnieuw bij een conflict op de remote
+
+    # gedeelde instanties per gebruiker (zie shared())
+    _shared = {}
+    _shared_locks = {}
+    _shared_guard = threading.Lock()
+
+    # instanties die bij afsluiten nog geflusht moeten worden (één atexit-hook)
+    _open = weakref.WeakSet()
+    _atexit_registered = False
+
     def __init__(
         self,
         user="default",
         token=None,
         repo_owner=None,
-        repo_name=None
+        repo_name=None,
+        backend=None,
+        remote=None,
+        sync_interval=300,
+        write_behind=False,
+        flush_every=10,
+        flush_interval=60,
+        compact_every=50,
+        journal_dir=None
     ):
         self.user = user
 
-        # Validatie configs
-        self.token = token or os.environ.get("GITHUB_TOKEN")
-        self.repo_owner = repo_owner or os.environ.get("REPO_OWNER")
-        self.repo_name = repo_name or os.environ.get("REPO_NAME")
+        if backend is None:
+            backend = GitHubBackend.from_env(token, repo_owner, repo_name) or JSONFileBackend()
+        self.backend = backend
+        self.remote = remote
+        self.sync_interval = sync_interval
+        self._last_sync = time.monotonic()
+
+        # Write-behind instellingen
+        self.write_behind = write_behind
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.journal_path = os.path.join(journal_dir or self.JOURNAL_DIR, f"{self.user}.jsonl")
 
-        if not all([self.token, self.repo_owner, self.repo_name]):
-            raise ValueError("HistoryStore mist GitHub configuratie (token/owner/repo).")
+        # Event-log administratie
+        self.compact_every = compact_every
+        self._seq = 0              # laatst uitgedeelde event-seq
+        self._uncompacted = 0      # events sinds de laatste snapshot
+        self._dirty = set()        # qids gewijzigd sinds de laatste snapshot
+        self._loaded_ids = set()   # ids van events na de snapshot
 
-        self.path = f"data/history/{self.user}.json"
-        self.api_url = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/{self.path}"
-        self.headers = {"Authorization": f"token {self.token}"}
+        self._lock = threading.RLock()
+        self._pending = []
+        self._timer = None
+        self._listeners = []
 
         self.data = self._load()
+        self._revision = self.backend.revision(self.user, refresh=False)
+        self._checked = time.monotonic()
+        self._replay_journal()
+
+        if self.write_behind or self.remote is not None:
+            self._register_atexit()
+
+    @classmethod
+    def _flush_open(cls):
+        for store in list(cls._open):
+            try:
+                store.flush()
+            except Exception as e:
+                print(f"⚠️ Flush bij afsluiten mislukt: {e}")
+
+    def _register_atexit(self):
+        # één hook per proces; anders stapelen registraties zich op (Streamlit reruns)
+        with HistoryStore._shared_guard:
+            HistoryStore._open.add(self)
+            if not HistoryStore._atexit_registered:
+                atexit.register(HistoryStore._flush_open)
+                HistoryStore._atexit_registered = True
 
     # ---------------------------------------------------------
-    # Laden vanuit GitHub (of nieuw maken)
+    # Eén instantie per gebruiker per proces (bv. Streamlit reruns)
+    # ---------------------------------------------------------
+    @classmethod
+    def shared(cls, user="default", ttl=30, **kwargs):
+        """
+        Geef de gedeelde HistoryStore voor `user`; maak hem zo nodig aan.
+        Na `ttl` seconden wordt bij de backend gecontroleerd of de opslag
+        elders gewijzigd is (andere SHA) en zo ja opnieuw geladen.
+        Veilig om vanuit meerdere threads aan te roepen.
+        """
+        with cls._shared_guard:
+            user_lock = cls._shared_locks.setdefault(user, threading.Lock())
+
+        with user_lock:
+            store = cls._shared.get(user)
+            if store is None:
+                store = cls(user, **kwargs)
+                cls._shared[user] = store
+                return store
+
+        if time.monotonic() - store._checked >= ttl:
+            store.refresh()
+        return store
+
+    def refresh(self):
+        """Herlaad als de opgeslagen versie niet meer overeenkomt met de onze."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                revision = self.backend.revision(self.user)
+            except Exception as e:
+                print(f"⚠️ Kon versie niet controleren: {e}")
+                return False
+
+            if revision is None or revision == self._revision:
+                return False
+
+            # elders gewijzigd → opnieuw laden, openstaande antwoorden opnieuw toepassen
+            self._pending.clear()
+            self.data = self._load()
+            self._revision = revision
+            self._replay_journal()
+            self._notify(None, None)
+            return True
+
+    # ---------------------------------------------------------
+    # Listeners (bv. engines die een eigen index bijhouden)
+    # ---------------------------------------------------------
+    def add_listener(self, callback):
+        """
+        callback(qid, hist) wordt aangeroepen na elke wijziging van een vraag;
+        callback(None, None) betekent dat alles opnieuw geladen is.
+        Methodes worden zwak vastgehouden: een weggegooide engine blijft
+        dus niet hangen aan een gedeelde HistoryStore.
+        """
+        if hasattr(callback, "__self__"):
+            self._listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._listeners.append(lambda: callback)
+
+    def _notify(self, qid, hist):
+        alive = []
+        for ref in self._listeners:
+            callback = ref()
+            if callback is not None:
+                callback(qid, hist)
+                alive.append(ref)
+        self._listeners = alive
+
+    # ---------------------------------------------------------
+    # Laden: snapshot + events daarna (uit backend, of remote, of nieuw)
     # ---------------------------------------------------------
     def _load(self):
-        r = requests.get(self.api_url, headers=self.headers)
+        source = self.backend
+        data = self.backend.load(self.user)
+        events = []
+        remote_pending = False
+
+        if data is None and self.remote is not None:
+            # eerste start op deze machine → geschiedenis van remote ophalen
+            try:
+                data = self.remote.load(self.user)
+                if data is not None:
+                    source = self.remote
+                    events = self.remote.load_events(self.user, data.get("seq", 0))
+            except Exception as e:
+                # niet leeg naar de remote pushen: sync() laadt hem later alsnog
+                print(f"⚠️ Remote niet bereikbaar: {e}")
+                data, events = None, []
+                remote_pending = True
+        elif data is not None:
+            events = self.backend.load_events(self.user, data.get("seq", 0))
+
+        new = data is None
+        if new:
+            data = {"user": self.user, "history": {}, "tag_stats": {}}
+            if remote_pending:
+                data["remote_pending"] = True
+
+        data.setdefault("history", {})
+        data.setdefault("tag_stats", {})
+        data.setdefault("seq", 0)
+
+        self.data = data
+        self._seq = data["seq"]
+        self._dirty = set()
+        self._loaded_ids = set()
 
-        if r.status_code == 200:
-            content = r.json().get("content", "")
-            decoded = base64.b64decode(content).decode("utf-8")
-            return json.loads(decoded)
+        for event in events:
+            self._apply_event(event)
+            self._seq = max(self._seq, event["seq"])
+            self._loaded_ids.add(event.get("id"))
+        self._uncompacted = len(events)
+
+        if new or source is not self.backend:
+            # lokale snapshot aanmaken; de remote events zitten er al in
+            data["seq"] = data["synced_seq"] = self._seq
+            try:
+                self.backend.save(self.user, data)
+            except ConflictError:
+                return self._load()   # net elders aangemaakt → die versie laden
+            self._uncompacted = 0
+            self._dirty = set()
 
-        # nieuw bestand
-        data = {"user": self.user, "history": {}, "tag_stats": {}}
-        self._save(data)
         return data
 
     # ---------------------------------------------------------
-    # Opslaan naar GitHub
+    # Schrijven: events toevoegen, snapshot compacteren, remote sync
+    # ---------------------------------------------------------
+    def _append(self, events):
+        self._rebase(events)
+        if not self.backend.append_events(self.user, events):
+            print("⚠️ Opslagfout: events niet weggeschreven")
+            return False
+        self._uncompacted += len(events)
+        self._revision = self.backend.revision(self.user, refresh=False)
+        return True
+
+    def _rebase(self, events):
+        """
+        Gedeelde backend (bijv. GitHub): heeft een andere instantie intussen
+        events met dezelfde seqs geschreven, dan eerst opnieuw laden en
+        `events` daarachter nummeren, zodat seqs in het log uniek blijven.
+        """
+        head = self.backend.head(self.user)
+        if head is None or not events or head < events[0]["seq"]:
+            return
+
+        self.data = self._load()
+        for event in events:
+            self._seq += 1
+            event["seq"] = self._seq
+            self._apply_event(event)
+        self._notify(None, None)
+
+    def compact(self):
+        """Vouw het event-log samen tot een nieuwe snapshot."""
+        with self._lock:
+            if not self._flush_pending():
+                return False
+
+            self.data["seq"] = self._seq
+            try:
+                if not self.backend.save(self.user, self.data, self._dirty):
+                    return False
+            except ConflictError:
+                # snapshot elders bijgewerkt: eerst die versie laden
+                print("ℹ️ Geschiedenis elders gewijzigd, opnieuw laden")
+                self.refresh()
+                return False
+
+            self._uncompacted = 0
+            self._dirty = set()
+            self._loaded_ids = set()
+            self._revision = self.backend.revision(self.user, refresh=False)
+            return True
+
+    def sync(self, force=False):
+        """Synchroniseer naar de remote backend als het interval verstreken is."""
+        if self.remote is None:
+            return True
+        if not force and time.monotonic() - self._last_sync < self.sync_interval:
+            return True
+
+        with self._lock:
+            if not self._flush_pending():
+                return False
+
+            ok = False
+            for _ in range(self.SYNC_ATTEMPTS):
+                try:
+                    ok = self._push_remote()
+                    break
+                except ConflictError:
+                    # remote tijdens het samenvoegen gewijzigd → opnieuw samenvoegen
+                    print("ℹ️ Remote gewijzigd tijdens sync, opnieuw samenvoegen")
+                except Exception as e:
+                    print(f"⚠️ Sync naar remote mislukt: {e}")
+                    break
+
+        if ok:
+            self._last_sync = time.monotonic()
+        return ok
+
+    def _push_remote(self):
+        """
+        Lokale, nog niet gepushte events samenvoegen met de remote.
+
+        De remote kan intussen door een andere instantie (web-app, andere pc)
+        bijgewerkt zijn. Daarom eerst de remote snapshot + events na zijn seq
+        laden; is de remote sinds de vorige sync veranderd (of nog nooit
+        geladen, remote_pending), dan wordt de stand opnieuw opgebouwd uit de
+        remote met de lokale events erachter, opnieuw genummerd vanaf de
+        remote kop (al aanwezige ids overgeslagen). De snapshot wordt
+        voorwaardelijk opgeslagen; ConflictError → de aanroeper probeert opnieuw.
+        """
+        synced = self.data.get("synced_seq", 0)
+        local_events = self.backend.load_events(self.user, synced)
+
+        remote = self.remote.load(self.user)
+        remote_seq = remote.get("seq", 0) if remote else 0
+        # vanaf de vorige sync: ook eigen events die een andere instantie na
+        # een conflict al in zijn snapshot heeft opgenomen, worden zo herkend
+        remote_events = self.remote.load_events(self.user, min(remote_seq, synced)) if remote else []
+        head = max([remote_seq] + [e["seq"] for e in remote_events])
+
+        if remote is None or (head == synced and not self.data.get("remote_pending")):
+            # remote ongewijzigd sinds de vorige sync: lokale events zoals ze zijn
+            if remote is not None and not local_events:
+                return True
+            if local_events and not self.remote.append_events(self.user, local_events):
+                return False
+            self._save_remote(self.data, self._seq)
+            self.data.pop("remote_pending", None)
+            self.data["synced_seq"] = self._seq
+            # ook lokaal vastleggen, anders gaan na een herstart
+            # dezelfde events opnieuw naar de remote
+            self.compact()
+            return True
+
+        # stand opnieuw opbouwen (zonder tussentijdse listener-meldingen)
+        saved = (self.data, self._seq, self._dirty, self._listeners)
+        self._listeners = []
+        try:
+            remote.setdefault("history", {})
+            remote.setdefault("tag_stats", {})
+            self.data = remote
+            self._seq = head
+            for event in remote_events:
+                if event["seq"] > remote_seq:   # de rest zit al in de snapshot
+                    self._apply_event(event)
+
+            pushed = {e.get("id") for e in remote_events}
+            merged = []
+            for event in local_events:
+                if event.get("id") in pushed:
+                    continue
+                self._seq += 1
+                event = dict(event, seq=self._seq)
+                self._apply_event(event)
+                merged.append(event)
+            # nooit lager dan lokaal uitgedeelde seqs (die staan nog in het lokale log)
+            self._seq = max(self._seq, saved[1])
+
+            if merged and not self.remote.append_events(self.user, merged):
+                raise OSError("events niet naar de remote geschreven")
+            self._save_remote(self.data, self._seq)
+        except BaseException:
+            self.data, self._seq, self._dirty, self._listeners = saved
+            raise
+        self._listeners = saved[3]
+
+        self.data.pop("remote_pending", None)
+        self.data["seq"] = self.data["synced_seq"] = self._seq
+        self.backend.save(self.user, self.data)
+
+        self._uncompacted = 0
+        self._dirty = set()
+        self._loaded_ids = set()
+        self._revision = self.backend.revision(self.user, refresh=False)
+        self._notify(None, None)
+        return True
+
+    def _save_remote(self, data, seq):
+        """Snapshot naar de remote (voorwaardelijk; ConflictError bij een wijziging elders)."""
+        doc = {k: v for k, v in data.items() if k not in ("synced_seq", "remote_pending")}
+        doc["seq"] = seq
+        if not self.remote.save(self.user, doc):
+            raise OSError("snapshot niet naar de remote geschreven")
+
+    # ---------------------------------------------------------
+    # Journal (lokaal, crash-veilig) voor write-behind
     # ---------------------------------------------------------
-    def _save(self, content):
-        encoded = base64.b64encode(json.dumps(content, indent=2).encode()).decode()
+    def _journal(self, event):
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay_journal(self):
+        """Pas antwoorden toe die nog niet in de backend staan."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        entries = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # half geschreven regel na crash
+        if not entries:
+            return
 
-        # SHA ophalen
-        meta = requests.get(self.api_url, headers=self.headers)
-        sha = meta.json().get("sha") if meta.status_code == 200 else None
+        # Al weggeschreven (crash tussen wegschrijven en journal legen)? Een
+        # event krijgt bij het wegschrijven nooit een lagere seq dan in het
+        # journal, dus alleen het log vanaf de laagste journal-seq nakijken.
+        # Ook al gecompacteerde events staan nog in het log.
+        first = min(e.get("seq", 1) for e in entries)
+        try:
+            applied = {e.get("id") for e in self.backend.load_events(self.user, first - 1)}
+        except Exception as e:
+            print(f"⚠️ Kon event-log niet lezen: {e}")
+            applied = set()
+        applied |= self._loaded_ids
 
-        payload = {
-            "message": f"Update history for {self.user}",
-            "content": encoded,
-        }
-        if sha:
-            payload["sha"] = sha
+        for event in entries:
+            if event.get("id") in applied:
+                continue
 
-        r = requests.put(self.api_url, headers=self.headers, json=payload)
-        if r.status_code not in (200, 201):
-            print("⚠️ Opslagfout:", r.status_code, r.text)
+            # opnieuw nummeren: ondertussen kan het log verder gegroeid zijn
+            self._seq += 1
+            event["seq"] = self._seq
+            self._apply_event(event)
+            self._pending.append(event)
+
+        if self._pending:
+            if self.write_behind:
+                self._schedule_flush()
+            else:
+                self.flush()
+
+    def _clear_journal(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    # ---------------------------------------------------------
+    # Write-behind: wegschrijven van verzamelde antwoorden
+    # ---------------------------------------------------------
+    def _schedule_flush(self):
+        if self._timer is None and self.flush_interval:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_pending(self):
+        if not self._pending:
+            return True
+        if not self._append(self._pending):
+            return False
+        self._pending = []
+        self._clear_journal()
+        return True
+
+    def flush(self):
+        """Schrijf alle openstaande antwoorden als één commit weg."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self._flush_pending():
+                self._schedule_flush()  # later opnieuw proberen
+                return False
+
+            if self._uncompacted >= self.compact_every:
+                self.compact()
+            return self.sync(force=True)
 
     # ---------------------------------------------------------
     # Update bij vraagbeantwoording
     # ---------------------------------------------------------
-    def update_question(self, qid, is_correct):
+    def _apply(self, qid, is_correct, ts):
         hist = self.data["history"].get(
             qid,
             {"last": None, "box": 0, "correct": 0, "wrong": 0}
         )
 
-        hist["last"] = datetime.now().isoformat()
+        hist["last"] = ts
 
         if is_correct:
             hist["box"] = min(hist["box"] + 1, 5)
@@ -234,4 +990,59 @@ class HistoryStore:
             hist["wrong"] += 1
 
         self.data["history"][qid] = hist
-        self._save(self.data)
+        if self._listeners:
+            self._notify(qid, hist)
+
+    def _apply_tags(self, tags, is_correct):
+        for tag in tags:
+            stats = self.data["tag_stats"].setdefault(tag, {"correct": 0, "wrong": 0})
+            stats["correct" if is_correct else "wrong"] += 1
+
+    def _apply_event(self, event):
+        if event.get("qid") is not None:
+            self._apply(event["qid"], event["correct"], event["ts"])
+            self._dirty.add(event["qid"])
+        if event.get("tags"):
+            self._apply_tags(event["tags"], event["correct"])
+
+    def _record(self, **fields):
+        """Maak een nieuw event, pas het toe en schrijf (of queue) het weg."""
+        with self._lock:
+            self._seq += 1
+            event = {
+                "seq": self._seq,
+                "id": uuid.uuid4().hex[:12],
+                "user": self.user,
+                "ts": datetime.now().isoformat(),
+                **fields,
+            }
+            self._apply_event(event)
+
+            if self.write_behind:
+                self._journal(event)
+                self._pending.append(event)
+
+                if len(self._pending) >= self.flush_every:
+                    self.flush()
+                else:
+                    self._schedule_flush()
+                return
+
+            self._append([event])
+            if self._uncompacted >= self.compact_every:
+                self.compact()
+            self.sync()
+
+    def update_question(self, qid, is_correct, latency=None):
+        """Registreer een antwoord; `latency` = bedenktijd in seconden."""
+        self._record(
+            qid=qid,
+            correct=bool(is_correct),
+            latency=round(latency, 3) if latency is not None else None,
+        )
+
+    def update_tags(self, tags, is_correct):
+        """Werk de goed/fout-tellers per tag bij (voor het resultatenscherm)."""
+        if not tags:
+            return
+        self._record(tags=list(tags), correct=bool(is_correct))
@@ -1,12 +1,11 @@
 import streamlit as st
 import json
-import requests
-import base64
 import uuid
 import time
 import math
-import pandas as pd
-import ast
+from utils import images, importers, shards
+from utils.github import GitHubClient, GitHubError
+from utils.image_cache import get_image_cache
 
 
 # -------------------------------------------------------------
@@ -17,8 +16,9 @@ OWNER = st.secrets["REPO_OWNER"]
 REPO = st.secrets["REPO_NAME"]
 JSON_PATH = st.secrets["FILE_PATH"]
 IMAGE_DIR = "data/images"
+SHARD_DIR = shards.SHARD_DIR
+MANIFEST_PATH = f"{SHARD_DIR}/{shards.MANIFEST}"
 
-API_RAW = f"https://api.github.com/repos/{OWNER}/{REPO}/contents/{JSON_PATH}"
 
 st.set_page_config(page_title="DocQuiz Admin", layout="centered")
 st.title("🔧 DocQuiz Admin")
@@ -35,45 +35,96 @@ def clean(v):
     return v
 
 
-def github_get(url):
-    return requests.get(url, headers={"Authorization": f"token {TOKEN}"})
+@st.cache_resource
+def get_github():
+    """Eén client per proces: SHA/ETag blijven bewaard tussen reruns."""
+    return GitHubClient(TOKEN, OWNER, REPO)
 
 
-def github_put(url, bytes_data, sha, msg):
-    encoded = base64.b64encode(bytes_data).decode()
-    payload = {"message": msg, "content": encoded}
-    if sha:
-        payload["sha"] = sha
-    return requests.put(
-        url, headers={"Authorization": f"token {TOKEN}"}, data=json.dumps(payload)
-    )
+gh = get_github()
 
 
 def safe_img(url):
-    if not url:
-        return
-    try:
-        r = requests.get(url, timeout=4)
-        if r.status_code == 200:
-            st.image(r.content, width=350)
-    except:
-        pass
+    content = get_image_cache().get(url)
+    if content:
+        try:
+            st.image(content, width=350)
+        except Exception:
+            pass
 
 
 # -------------------------------------------------------------
 # LOAD JSON (GitHub API)
 # -------------------------------------------------------------
+LAYOUT_TTL = 60  # seconden: zo lang geldt de laatst geziene indeling (manifest of niet)
+
+
+@st.cache_resource
+def _layout():
+    """Per proces: laatst gezien manifest (None = monolithische JSON) en wanneer."""
+    return {"manifest": None, "checked": None}
+
+
+def remember_manifest(manifest):
+    state = _layout()
+    state["manifest"] = manifest
+    state["checked"] = time.monotonic()
+
+
+def load_manifest():
+    """
+    Manifest van de vraagbank per vak, of None (dan monolithische JSON).
+    Ook "geen manifest" wordt LAYOUT_TTL seconden onthouden, zodat een
+    rerun of opslag in monolithische modus geen 404-verzoek kost.
+    """
+    state = _layout()
+    if state["checked"] is not None and time.monotonic() - state["checked"] < LAYOUT_TTL:
+        return state["manifest"]
+    try:
+        raw = gh.get(MANIFEST_PATH)
+    except GitHubError as e:
+        st.error("Kon manifest niet laden via GitHub API!")
+        st.code(e.text)
+        st.stop()
+    remember_manifest(shards.decode_manifest(raw) if raw is not None else None)
+    return state["manifest"]
+
+
+def load_shard(vak, entry):
+    path = f"{SHARD_DIR}/{entry['file']}"
+    try:
+        raw = gh.get(path)  # ongewijzigd → 304
+    except GitHubError as e:
+        st.error(f"Kon {path} niet laden via GitHub API!")
+        st.code(e.text)
+        st.stop()
+    try:
+        return shards.decode_shard(raw) if raw is not None else []
+    except Exception as e:
+        st.error(f"Kon {path} niet decoderen!")
+        st.text(str(e))
+        st.stop()
+
+
 def load_data(_reload):
-    r = github_get(API_RAW)
-    if r.status_code != 200:
+    manifest = load_manifest()
+    if manifest is not None:
+        # vakken worden pas opgehaald als ze gebruikt worden
+        return shards.LazySubjects(manifest, load_shard)
+
+    try:
+        raw = gh.get(JSON_PATH)  # ongewijzigd → 304, inhoud uit geheugen
+    except GitHubError as e:
         st.error("Kon JSON niet laden via GitHub API!")
-        st.code(r.text)
+        st.code(e.text)
+        st.stop()
+
+    if raw is None:
+        st.error(f"Bestand {JSON_PATH} niet gevonden in de repository!")
         st.stop()
 
     try:
-        content = r.json().get("content", "")
-        decoded = base64.b64decode(content).decode("utf-8")
-        data = json.loads(decoded)
+        data = json.loads(raw.decode("utf-8"))
     except Exception as e:
         st.error("Kon JSON niet decoderen!")
         st.text(str(e))
@@ -90,16 +141,21 @@ def load_data(_reload):
 # SAVE JSON
 # -------------------------------------------------------------
 def save_json(data):
+    if isinstance(data, shards.LazySubjects):
+        cleaned = {
+            tab: [{k: clean(v) for k, v in q.items()} for q in qs]
+            for tab, qs in data.loaded().items()
+        }
+        return save_shards(cleaned, data.manifest, keep=data.unloaded())
+
     cleaned = {}
     for tab, qs in data.items():
         cleaned[tab] = [{k: clean(v) for k, v in q.items()} for q in qs]
 
     raw_bytes = json.dumps(cleaned, indent=2).encode()
 
-    meta = github_get(API_RAW).json()
-    sha = meta.get("sha")
-
-    r = github_put(API_RAW, raw_bytes, sha, "Update questions.json")
+    # bekende SHA wordt hergebruikt → geen extra GET
+    r = gh.put(JSON_PATH, raw_bytes, "Update questions.json")
 
     if r.status_code not in (200, 201):
         st.error("❌ Opslaan mislukt!")
@@ -110,29 +166,88 @@ def save_json(data):
     return True
 
 
-# -------------------------------------------------------------
-# UPLOAD IMAGE
-# -------------------------------------------------------------
-def upload_image(bytes_data, filename):
-    path = f"{IMAGE_DIR}/{filename}"
-    api = f"https://api.github.com/repos/{OWNER}/{REPO}/contents/{path}"
-
-    meta = github_get(api).json()
-    sha = meta.get("sha")
-
-    encoded = base64.b64encode(bytes_data).decode()
-    payload = {"message": f"Upload {filename}", "content": encoded}
-    if sha:
-        payload["sha"] = sha
+def save_shards(cleaned, manifest, keep=()):
+    """
+    Schrijf alleen de gewijzigde vakken, daarna pas het manifest.
+    Vakken in `keep` zijn niet geladen en blijven ongemoeid.
+    """
+    new_manifest, changed, removed = shards.split(cleaned, manifest, keep)
+
+    for fname, raw_bytes in changed.items():
+        r = gh.put(f"{SHARD_DIR}/{fname}", raw_bytes, f"Update {fname}")
+        if r.status_code not in (200, 201):
+            st.error(f"❌ Opslaan van {fname} mislukt!")
+            st.code(r.text)
+            return False
+
+    if new_manifest != manifest:
+        r = gh.put(MANIFEST_PATH, shards.encode_manifest(new_manifest), "Update manifest.json")
+        if r.status_code not in (200, 201):
+            st.error("❌ Opslaan van manifest mislukt!")
+            st.code(r.text)
+            return False
+    remember_manifest(new_manifest)
+
+    # verwijderde vakken: pas na het manifest, dat er niet meer naar verwijst
+    for fname in removed:
+        gh.delete(f"{SHARD_DIR}/{fname}", f"Remove {fname}")
 
-    r = requests.put(
-        api, headers={"Authorization": f"token {TOKEN}"}, data=json.dumps(payload)
-    )
+    st.session_state["reload_key"] = time.time()
+    return True
 
-    if r.status_code not in (200, 201):
-        return None
 
-    return f"https://raw.githubusercontent.com/{OWNER}/{REPO}/main/{path}"
+# -------------------------------------------------------------
+# UPLOAD IMAGE
+# -------------------------------------------------------------
+def upload_image(bytes_data):
+    """
+    Verklein de afbeelding naar WebP-varianten (display + thumbnail) en
+    upload ze onder de content-hash van het origineel. Bestaan ze al
+    (dezelfde afbeelding eerder geüpload), dan wordt niets geüpload.
+    Geeft {variant: url} terug, of None bij een fout.
+    """
+    # eerst op hash controleren: een dubbele upload kost geen verkleinen/encoderen
+    digest = images.content_hash(bytes_data)
+    try:
+        existing = set(gh.list_dir(IMAGE_DIR))  # conditioneel: meestal een 304
+    except GitHubError:
+        existing = set()
+
+    names = {variant: images.variant_name(digest, variant) for variant in images.VARIANTS}
+    missing = [variant for variant, name in names.items() if name not in existing]
+
+    variants = {}
+    if missing:
+        try:
+            variants = images.make_variants(bytes_data)
+        except Exception as e:
+            st.error(f"❌ Kon afbeelding niet verwerken: {e}")
+            return None
+
+    urls = {}
+    for variant, name in names.items():
+        path = f"{IMAGE_DIR}/{name}"
+
+        if variant in missing:
+            # nieuw bestand → direct PUT; bestaat het toch, dan lost de client
+            # het conflict op door de SHA alsnog op te halen
+            r = gh.put(path, variants[variant], f"Upload {name}")
+            if r.status_code not in (200, 201):
+                return None
+
+        urls[variant] = gh.raw_url(path)
+
+    return urls
+
+
+def set_image(q, urls):
+    """Afbeelding van vraag `q` instellen (urls=None → verwijderen)."""
+    if urls:
+        q["image_url"] = urls["display"]
+        q["image_variants"] = urls
+    else:
+        q["image_url"] = ""
+        q.pop("image_variants", None)
 
 
 # -------------------------------------------------------------
@@ -320,7 +435,7 @@ if st.session_state.mode == "edit":
     st.markdown("### Afbeelding")
     safe_img(q.get("image_url"))
 
-    new_img = st.file_uploader("Nieuwe afbeelding", type=["png", "jpg", "jpeg"])
+    new_img = st.file_uploader("Nieuwe afbeelding", type=["png", "jpg", "jpeg", "webp"])
     rem_img = st.checkbox("Verwijder afbeelding")
 
     if st.button("💾 Opslaan"):
@@ -333,13 +448,11 @@ if st.session_state.mode == "edit":
         q["answer"] = ans
 
         if rem_img:
-            q["image_url"] = ""
+            set_image(q, None)
         elif new_img:
-            ext = new_img.name.split(".")[-1]
-            fname = f"{ev}_{uuid.uuid4().hex[:6]}.{ext}"
-            url = upload_image(new_img.read(), fname)
-            if url:
-                q["image_url"] = url
+            urls = upload_image(new_img.read())
+            if urls:
+                set_image(q, urls)
 
         if save_json(data):
             st.session_state.mode = "new"
@@ -358,45 +471,28 @@ st.subheader("📥 Excel importeren")
 
 excel_file = st.file_uploader("Upload een Excel-bestand (.xlsx)", type=["xlsx"])
 
+REQUIRED_COLS = ("vak", "id", "type", "topic", "text", "answer")
+
 if excel_file and st.button("Importeer Excel"):
-    try:
-        df = pd.read_excel(excel_file)
-
-        required_cols = {"vak", "id", "type", "topic", "text", "answer"}
-        if not required_cols.issubset(df.columns):
-            st.error(f"Excel mist verplichte kolommen: {required_cols}")
-            st.stop()
-
-        count = 0
-
-        for _, row in df.iterrows():
-            dvak = str(row["vak"]).strip()
-
-            if dvak not in data:
-                data[dvak] = []
-
-            q = {
-                "id": str(row["id"]),
-                "type": str(row["type"]),
-                "topic": str(row.get("topic", "")),
-                "text": str(row.get("text", "")),
-                "choices": ast.literal_eval(str(row["choices"]))
-                if str(row.get("choices")) not in ["", "nan", None]
-                else [],
-                "answer": row.get("answer"),
-                "explanation": str(row.get("explanation", "")),
-                "image_url": str(row.get("image_url", "")),
-                "difficulty": int(row.get("difficulty", 1)),
-            }
+    report = importers.ImportReport()
+    count = 0
 
-            data[dvak].append(q)
+    try:
+        # streamend en kolomsgewijs; foute rijen worden overgeslagen en gemeld
+        rows = importers.read_excel(excel_file, report=report, required=REQUIRED_COLS)
+        for q in rows:
+            data.setdefault(q.pop("vak").strip(), []).append(q)
             count += 1
 
-        if save_json(data):
-            st.success(f"Succesvol {count} vragen geïmporteerd!")
-
     except Exception as e:
         st.error(f"❌ Fout bij importeren: {e}")
+        st.stop()
+
+    if report.errors:
+        st.warning(report.summary())
+
+    if count and save_json(data):
+        st.success(f"Succesvol {count} vragen geïmporteerd!")
 
 
 # -------------------------------------------------------------
@@ -422,21 +518,13 @@ if st.session_state.mode == "new":
         nop = ""
         nans = st.text_input("Antwoord")
 
-    nimg = st.file_uploader("Afbeelding", type=["png", "jpg", "jpeg"])
+    nimg = st.file_uploader("Afbeelding", type=["png", "jpg", "jpeg", "webp"])
 
     if st.button("Toevoegen"):
         if nt.strip() == "":
             st.error("Vraagtekst mag niet leeg zijn.")
         else:
 
-            img = ""
-            if nimg:
-                ext = nimg.name.split(".")[-1]
-                fname = f"{vak}_{uuid.uuid4().hex[:6]}.{ext}"
-                url = upload_image(nimg.read(), fname)
-                if url:
-                    img = url
-
             newq = {
                 "id": f"q{uuid.uuid4().hex[:6]}",
                 "text": nt,
@@ -445,8 +533,8 @@ if st.session_state.mode == "new":
                 "explanation": nexp,
                 "choices": [s.strip() for s in nop.split(",")] if ntp == "mc" else [],
                 "answer": nans,
-                "image_url": img,
             }
+            set_image(newq, upload_image(nimg.read()) if nimg else None)
 
             data[vak].append(newq)
 
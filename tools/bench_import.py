@@ -0,0 +1,136 @@
+"""
+Benchmark: import-doorvoer van CSV/Excel, oude rij-voor-rij import
+(iterrows + ast.literal_eval) vs. de streaming importers.
+
+Meet rijen/s en piekgeheugen (KiB) bij het doorlopen van alle vragen.
+
+Gebruik:
+    python -m tools.bench_import --rows 1000 5000
+"""
+import argparse
+import ast
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from tools.synthetic import make_questions
+from utils import importers
+
+COLUMNS = ["id", "type", "topic", "text", "choices", "answer", "explanation",
+           "image_path", "formula_latex", "tags", "difficulty"]
+
+
+def _cells(q):
+    return [q["id"], q["type"], q["topic"], q["text"], repr(q["choices"]), q["answer"],
+            q["explanation"], "", "", repr(q["tags"]), q["difficulty"]]
+
+
+def write_files(rows, directory):
+    questions = make_questions(rows)
+    csv_path = os.path.join(directory, "bench.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(_cells(q) for q in questions)
+
+    import openpyxl
+    xlsx_path = os.path.join(directory, "bench.xlsx")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("DC")
+    ws.append(COLUMNS)
+    for q in questions:
+        ws.append(_cells(q))
+    wb.save(xlsx_path)
+    return csv_path, xlsx_path
+
+
+# ---- oude aanpak: QuestionBank.import_from_csv/-excel vóór de streaming
+# importers (80b78cc), veld voor veld, zonder het wegschrijven naar JSON ----
+def legacy_csv(path):
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            yield {
+                "id": row["id"],
+                "type": row["type"],
+                "topic": row["topic"],
+                "text": row["text"],
+                "difficulty": int(row.get("difficulty", 1)),
+                "choices": ast.literal_eval(row["choices"]) if row["choices"] else [],
+                "answer": ast.literal_eval(row["answer"]) if row["answer"] else None,
+                "explanation": row.get("explanation", ""),
+                "image_path": row.get("image_path", ""),
+                "formula_latex": row.get("formula_latex", ""),
+                "tags": ast.literal_eval(row["tags"]) if row["tags"] else [],
+            }
+
+
+def legacy_excel(path):
+    import pandas as pd
+    df = pd.read_excel(path, sheet_name="DC")
+    for _, row in df.iterrows():
+        q = {
+            "id": str(row["id"]),
+            "type": row["type"],
+            "topic": row["topic"],
+            "text": row["text"],
+            "choices": ast.literal_eval(str(row["choices"])) if pd.notna(row["choices"]) else [],
+            "answer": ast.literal_eval(str(row["answer"])) if pd.notna(row["answer"]) else None,
+            "explanation": row.get("explanation", ""),
+            "image_path": row.get("image_path", ""),
+            "formula_latex": row.get("formula_latex", ""),
+            "tags": ast.literal_eval(str(row["tags"])) if pd.notna(row["tags"]) else [],
+            "difficulty": int(row.get("difficulty", 1)),
+        }
+
+        if q["type"] == "input":
+            try:
+                q["answer_numeric"] = float(q["answer"])
+            except:
+                q["answer_numeric"] = None
+        else:
+            q["answer_numeric"] = None
+
+        yield q
+
+
+def run(make_rows):
+    """Doorvoer (rijen/s) en piekgeheugen bij het doorlopen van alle rijen."""
+    importers._parse_text.cache_clear()
+    t0 = time.perf_counter()
+    n = sum(1 for _ in make_rows())
+    elapsed = time.perf_counter() - t0
+
+    importers._parse_text.cache_clear()
+    tracemalloc.start()
+    for _ in make_rows():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n, n / elapsed, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path, xlsx_path = write_files(rows, tmp)
+            cases = {
+                "csv   oud":       lambda: legacy_csv(csv_path),
+                "csv   streaming": lambda: importers.read_csv(csv_path),
+                "excel oud":       lambda: legacy_excel(xlsx_path),
+                "excel streaming": lambda: importers.read_excel(xlsx_path, "DC"),
+            }
+            print(f"\n{rows} rijen")
+            for name, make_rows in cases.items():
+                n, rate, peak = run(make_rows)
+                print(f"  {name:<16} {rate:10.0f} rijen/s   piek {peak:9.1f} KiB   ({n} vragen)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: smart_select_questions (oude O(n²)-aanvulling vs. id-pool met
+heapq.nlargest vs. DueIndex) op synthetische banken.
+
+Gebruik:
+    python -m tools.bench_select --sizes 1000 10000 100000 --due 0.001
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from engine import SMART_BOX_WAIT, make_due_index, smart_select_questions
+from tools.synthetic import SyntheticHistory
+
+
+def make_bank(size, due_fraction, seed=1):
+    """Bank waarvan (ongeveer) `due_fraction` van de vragen aan de beurt is."""
+    rnd = random.Random(seed)
+    now = datetime.now()
+
+    questions = [{"id": f"q{i}", "type": "mc", "text": "..."} for i in range(size)]
+    history = {}
+    for q in questions:
+        box = rnd.randint(1, 5)
+        wait = SMART_BOX_WAIT[box]
+        age = wait * 2 if rnd.random() < due_fraction else wait / 2
+        history[q["id"]] = {
+            "last": (now - timedelta(seconds=age)).isoformat(),
+            "box": box,
+            "correct": 1,
+            "wrong": 0,
+        }
+    return questions, SyntheticHistory(history)
+
+
+def legacy_select(questions, history, n=5):
+    """De oorspronkelijke implementatie uit app_streamlit.py (ter vergelijking)."""
+    now = datetime.now()
+    candidates = []
+    for q in questions:
+        h = history.data["history"].get(q.get("id"), None)
+        if h:
+            box = h.get("box", 0)
+            last = h.get("last")
+            delta = (now - datetime.fromisoformat(last)).total_seconds() if last else 999999999
+        else:
+            box = 0
+            delta = 999999999
+        if delta < SMART_BOX_WAIT[box]:
+            continue
+        candidates.append(((5 - box) * 3 + delta / 86400, q))
+
+    if len(candidates) < n:
+        rest = [q for q in questions if q not in [qq for _, qq in candidates]]
+        random.shuffle(rest)
+        while len(candidates) < n and rest:
+            candidates.append((0, rest.pop()))
+
+    candidates.sort(key=lambda x: x[0], reverse=True)
+    return [q for _, q in candidates[:n]]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--due", type=float, default=0.001, help="fractie due vragen")
+    parser.add_argument("-n", type=int, default=20, help="vragen per sessie")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="oude implementatie alleen tot deze grootte (kwadratisch)")
+    args = parser.parse_args()
+
+    print(f"{'vragen':>8} {'legacy ms':>10} {'scan ms':>9} {'index bouw':>11} {'index ms':>9}")
+    for size in args.sizes:
+        questions, history = make_bank(size, args.due)
+
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy = f"{timed(lambda: legacy_select(questions, history, args.n), 1):10.1f}"
+
+        scan = timed(lambda: smart_select_questions(questions, history, args.n), args.repeat)
+
+        t0 = time.perf_counter()
+        index = make_due_index(questions, history)
+        build = (time.perf_counter() - t0) * 1000
+        indexed = timed(lambda: smart_select_questions(questions, history, args.n, index=index), args.repeat)
+
+        print(f"{size:>8} {legacy:>10} {scan:9.1f} {build:11.1f} {indexed:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: scalar _calc_weight (per vraag) vs. gevectoriseerde _calc_weights.
+
+Gebruik:
+    python -m tools.bench_weights --size 10000 --coverage 0.7
+"""
+import argparse
+import time
+
+import numpy as np
+
+from engine import SpacedRepetitionEngine
+from tools.synthetic import SyntheticHistory, make_bank, make_history, make_questions
+
+
+def make_engine(size, coverage, seed=1):
+    questions = make_questions(size, seed=seed)
+    waits = [w.total_seconds() for w in SpacedRepetitionEngine.BOX_WAIT]
+    # tijdstippen ver van de box-grenzen, zodat scalar en vector hetzelfde 'nu' zien
+    history = make_history(questions, coverage, box_wait=waits, seed=seed)
+    return SpacedRepetitionEngine(make_bank(questions), SyntheticHistory(history))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--coverage", type=float, default=0.7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = make_engine(args.size, args.coverage)
+    questions = engine.qbank.questions
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        scalar = [engine._calc_weight(q) for q in questions]
+    t_scalar = (time.perf_counter() - t0) / args.repeat
+
+    engine._calc_weights()  # arrays opbouwen (eenmalig)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        vector = engine._calc_weights()
+    t_vector = (time.perf_counter() - t0) / args.repeat
+
+    same = np.allclose(scalar, vector)
+    print(f"vragen: {args.size}  (coverage {args.coverage:.0%})")
+    print(f"scalar : {t_scalar * 1000:8.2f} ms")
+    print(f"vector : {t_vector * 1000:8.2f} ms")
+    print(f"speedup: {t_scalar / t_vector:8.1f}x   identiek: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark-suite voor de selectie-engines op synthetische belasting.
+
+Varieert bankgrootte, history-dekking, box-verdeling en aantal tags, en
+meet selectie, filteren, history laden en serialiseren. Rapporteert
+p50/p95 (ms) en piekgeheugen (KiB) als JSON, zodat regressies vóór de
+klas-deployment opvallen.
+
+Gebruik:
+    python -m tools.benchmark --sizes 1000 10000 --out bench_report.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from engine import SMART_BOX_WAIT, SpacedRepetitionEngine, make_due_index, smart_select_questions
+from models import HistoryStore
+from tools.synthetic import (
+    BOX_DISTRIBUTIONS, SyntheticHistory, make_bank, make_history, make_questions,
+)
+from utils.storage import JSONFileBackend, SQLiteBackend
+
+
+def measure(fn, repeat):
+    """Voer fn `repeat` keer uit; geef p50/p95 (ms) en piekgeheugen (KiB)."""
+    fn()  # opwarmen (caches, lazy opbouw)
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_scenario(size, coverage, boxes, tags, n, repeat):
+    questions = make_questions(size, tags=tags)
+    history = SyntheticHistory(make_history(questions, coverage, boxes, SMART_BOX_WAIT))
+    qbank = make_bank(questions)
+    engine = SpacedRepetitionEngine(qbank, history, seed=1)
+    index = make_due_index(questions, history)
+    some_tags = [f"tag{i}" for i in range(min(3, tags))]
+
+    results = {
+        "bank.build": measure(lambda: make_bank(questions), repeat),
+        "engine.select_questions": measure(lambda: engine.select_questions(n=n), repeat),
+        "engine.select_questions.tags": measure(
+            lambda: engine.select_questions(n=n, tags=some_tags), repeat
+        ),
+        "smart_select.scan": measure(lambda: smart_select_questions(questions, history, n), repeat),
+        "smart_select.index": measure(
+            lambda: smart_select_questions(questions, history, n, index=index), repeat
+        ),
+        "qbank.filter": measure(
+            lambda: (qbank._filter_cache.clear(),
+                     qbank.filter(tags=some_tags, exclude_topics=["topic0"])),
+            repeat,
+        ),
+        "history.serialize": measure(lambda: json.dumps(history.data, indent=2), repeat),
+    }
+
+    # history laden via de echte backends (bestand in tijdelijke map)
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "json": JSONFileBackend(tmp),
+            "sqlite": SQLiteBackend(os.path.join(tmp, "history.db")),
+        }
+        for name, backend in backends.items():
+            backend.save(history.user, dict(history.data, seq=0))
+            results[f"history.load.{name}"] = measure(
+                lambda: HistoryStore(history.user, backend=backend, journal_dir=tmp), repeat
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--coverage", type=float, nargs="+", default=[0.1, 0.9])
+    parser.add_argument("--boxes", nargs="+", default=["uniform"], choices=sorted(BOX_DISTRIBUTIONS))
+    parser.add_argument("--tags", type=int, nargs="+", default=[20])
+    parser.add_argument("-n", type=int, default=20, help="vragen per sessie")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="schrijf het rapport (JSON) naar dit bestand")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "n": args.n, "scenarios": []}
+
+    for size in args.sizes:
+        for coverage in args.coverage:
+            for boxes in args.boxes:
+                for tags in args.tags:
+                    params = {"size": size, "coverage": coverage, "boxes": boxes, "tags": tags}
+                    results = run_scenario(size, coverage, boxes, tags, args.n, args.repeat)
+                    report["scenarios"].append({"params": params, "results": results})
+
+                    print(f"\n{params}")
+                    for name, r in results.items():
+                        print(f"  {name:<30} p50 {r['p50_ms']:9.3f} ms   "
+                              f"p95 {r['p95_ms']:9.3f} ms   piek {r['peak_kib']:9.1f} KiB")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRapport geschreven naar {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Zet de monolithische vraag-JSON om naar de vraagbank per vak.
+
+Schrijft data/questions/manifest.json en één bestand per vak (zie
+utils/shards.py). Vakken waarvan de hash niet veranderd is blijven
+ongemoeid.
+
+Gebruik:
+    python -m tools.build_shards --source data/questions.json --out data/questions
+"""
+import argparse
+import json
+import os
+
+from utils import shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", default="data/questions.json")
+    parser.add_argument("--out", default=shards.SHARD_DIR)
+    args = parser.parse_args()
+
+    with open(args.source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or "questions" in data:
+        parser.error(f"{args.source} is geen vraag-JSON per vak ({{vak: [vragen]}})")
+
+    manifest_path = os.path.join(args.out, shards.MANIFEST)
+    previous = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "rb") as f:
+            previous = shards.decode_manifest(f.read())
+
+    manifest, changed, removed = shards.split(data, previous)
+
+    os.makedirs(args.out, exist_ok=True)
+    for fname, raw in changed.items():
+        with open(os.path.join(args.out, fname), "wb") as f:
+            f.write(raw)
+    for fname in removed:
+        path = os.path.join(args.out, fname)
+        if os.path.exists(path):
+            os.remove(path)
+    with open(manifest_path, "wb") as f:
+        f.write(shards.encode_manifest(manifest))
+
+    for vak, entry in manifest["subjects"].items():
+        mark = "*" if entry["file"] in changed else " "
+        print(f"{mark} {vak:<30} {entry['count']:5d} vragen  {entry['file']}")
+    print(f"{len(changed)} gewijzigd, {len(removed)} verwijderd → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Controles voor HistoryStore met een remote (herstart, offline start).
+
+Draait tegen tijdelijke mappen met JSON/SQLite-backends; een remote die
+"offline" gezet kan worden simuleert een onbereikbare GitHub. Stopt met
+een AssertionError zodra een scenario niet klopt.
+
+Gebruik:
+    python -m tools.check_history
+"""
+import hashlib
+import os
+import tempfile
+
+from models import HistoryStore
+from utils.storage import ConflictError, JSONFileBackend, SQLiteBackend
+
+
+class FlakyRemote(JSONFileBackend):
+    """
+    JSON-backend die zich gedraagt als GitHub: ConnectionError zolang
+    `offline` True is, voorwaardelijk opslaan (ConflictError als het bestand
+    sinds de laatste load/save van déze instantie gewijzigd is) en head().
+    """
+
+    offline = False
+    before_save = None   # eenmalige hook: wijziging "elders" vlak voor het opslaan
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self._version = None
+
+    def _check(self):
+        if self.offline:
+            raise ConnectionError("remote offline")
+
+    def _current(self, user):
+        try:
+            with open(self._path(user), "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def load(self, user):
+        self._check()
+        self._version = self._current(user)
+        return super().load(user)
+
+    def save(self, user, data, changed=None):
+        self._check()
+        hook, self.before_save = self.before_save, None
+        if hook:
+            hook()
+        if self._current(user) != self._version:
+            raise ConflictError(user)
+        ok = super().save(user, data, changed)
+        self._version = self._current(user)
+        return ok
+
+    def head(self, user):
+        events = super().load_events(user)
+        return max((e["seq"] for e in events), default=0)
+
+    def append_events(self, user, events):
+        self._check()
+        return super().append_events(user, events)
+
+    def load_events(self, user, after_seq=0):
+        self._check()
+        return super().load_events(user, after_seq)
+
+
+def _store(local, remote, tmp):
+    return HistoryStore("tester", backend=local, remote=remote,
+                        journal_dir=f"{tmp}/journal", sync_interval=0)
+
+
+def _seed_remote(remote, n):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(JSONFileBackend(f"{tmp}/seed"), remote, tmp)
+        for i in range(n):
+            store.update_question(f"Q{i}", True)
+        store.flush()
+
+
+def check_offline_first_start(make_local):
+    """Eerste start zonder remote mag de remote-geschiedenis niet overschrijven."""
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = FlakyRemote(f"{tmp}/remote")
+        _seed_remote(remote, 50)
+
+        remote.offline = True
+        store = _store(make_local(tmp), remote, tmp)
+        store.update_question("NEW", False)
+        assert not store.flush()
+
+        # herstart, nog steeds offline
+        store = _store(make_local(tmp), remote, tmp)
+        store.update_question("NEW", True)
+        assert not store.flush()
+
+        remote.offline = False
+        assert store.flush()
+
+        data = remote.load("tester")
+        assert len(data["history"]) == 51, len(data["history"])
+        assert data["history"]["NEW"]["correct"] == 1
+        assert data["history"]["NEW"]["wrong"] == 1
+        assert len(store.data["history"]) == 51
+
+
+def check_restart_sync(make_local):
+    """Na een herstart gaan al gesynchroniseerde events niet nog eens naar de remote."""
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = FlakyRemote(f"{tmp}/remote")
+
+        store = _store(make_local(tmp), remote, tmp)
+        for qid in ("A", "B", "C"):
+            store.update_question(qid, True)
+        assert store.flush()
+
+        store = _store(make_local(tmp), remote, tmp)
+        assert store.flush()
+        store.update_question("D", False)
+        assert store.flush()
+
+        seqs = [e["seq"] for e in remote.load_events("tester")]
+        assert seqs == [1, 2, 3, 4], seqs
+
+
+def check_two_writers(make_local):
+    """Web-app (remote als backend) en Tk-app (lokaal + remote) op dezelfde gebruiker."""
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = f"{tmp}/remote"
+        web = HistoryStore("tester", backend=FlakyRemote(shared), journal_dir=f"{tmp}/wj")
+        web.update_question("W1", True)
+
+        tk = _store(make_local(tmp), FlakyRemote(shared), tmp)
+        web.update_question("W2", True)
+        tk.update_question("T1", True)
+        assert tk.flush()
+
+        # web schrijft verder: nummert na de kop van de remote
+        web.update_question("W3", True)
+        assert web.compact()
+
+        # conflict: web compacteert terwijl Tk aan het synchroniseren is
+        tk.remote.before_save = lambda: (web.update_question("W4", True), web.compact())
+        tk.update_question("T2", False)
+        assert tk.flush()
+
+        remote = FlakyRemote(shared)
+        data = remote.load("tester")
+        events = remote.load_events("tester", 0)
+        seqs = [e["seq"] for e in events]
+        assert len(seqs) == len(set(seqs)), seqs
+
+        fresh = HistoryStore("tester", backend=FlakyRemote(shared), journal_dir=f"{tmp}/fj")
+        assert sorted(fresh.data["history"]) == ["T1", "T2", "W1", "W2", "W3", "W4"], fresh.data["history"]
+        assert all(h["correct"] + h["wrong"] == 1 for h in fresh.data["history"].values())
+        assert sorted(tk.data["history"]) == sorted(fresh.data["history"])
+        assert data["seq"] <= max(seqs)
+
+
+def main():
+    for name, make_local in [
+        ("json", lambda tmp: JSONFileBackend(f"{tmp}/local")),
+        ("sqlite", lambda tmp: SQLiteBackend(f"{tmp}/local/history.db")),
+    ]:
+        check_offline_first_start(make_local)
+        print(f"✅ {name}: offline eerste start")
+        check_restart_sync(make_local)
+        print(f"✅ {name}: herstart zonder dubbele sync")
+        check_two_writers(make_local)
+        print(f"✅ {name}: web + Tk op dezelfde remote")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Synthetische vraagbanken en geschiedenis voor benchmarks.
+"""
+import random
+from datetime import datetime, timedelta
+
+from models import QuestionBank
+
+# kansverdeling over Leitner-box 0..5
+BOX_DISTRIBUTIONS = {
+    "uniform": [1, 1, 1, 1, 1, 1],
+    "new":     [6, 4, 2, 1, 0.5, 0.25],   # vooral lage boxen (beginnende student)
+    "mature":  [0.25, 0.5, 1, 2, 4, 6],   # vooral hoge boxen (veel herhaald)
+}
+
+
+class SyntheticHistory:
+    """Minimale stand-in voor HistoryStore (alleen wat de engines lezen)."""
+
+    def __init__(self, history, user="bench"):
+        self.user = user
+        self.data = {"user": user, "history": history, "tag_stats": {}}
+
+    def add_listener(self, callback):
+        pass
+
+
+def make_questions(size, tags=20, topics=10, tags_per_question=3, seed=1):
+    """Lijst van vraag-dicts zoals in data/questions.json."""
+    rnd = random.Random(seed)
+    tag_names = [f"tag{i}" for i in range(tags)]
+    topic_names = [f"topic{i}" for i in range(topics)]
+
+    return [
+        {
+            "id": f"q{i}",
+            "type": "mc",
+            "topic": rnd.choice(topic_names),
+            "text": f"Synthetische vraag {i}?",
+            "choices": ["A", "B", "C"],
+            "answer": rnd.randint(0, 2),
+            "explanation": "Uitleg " * 10,
+            "tags": rnd.sample(tag_names, min(tags_per_question, tags)),
+            "difficulty": rnd.randint(1, 3),
+        }
+        for i in range(size)
+    ]
+
+
+def make_bank(questions):
+    """QuestionBank uit vraag-dicts, zonder bestand."""
+    return QuestionBank.from_questions(questions)
+
+
+def make_history(questions, coverage=0.5, boxes="uniform", box_wait=None, seed=1):
+    """
+    History-dict voor een fractie `coverage` van de vragen. Tijdstippen
+    liggen ruim voor of na de wachttijd van de box (`box_wait`, seconden),
+    zodat de uitkomst niet afhangt van het exacte meetmoment.
+    """
+    rnd = random.Random(seed)
+    weights = BOX_DISTRIBUTIONS[boxes]
+    now = datetime.now()
+
+    history = {}
+    for q in questions:
+        if rnd.random() >= coverage:
+            continue
+        box = rnd.choices(range(6), weights=weights)[0]
+        wait = box_wait[box] if box_wait else 86400 * box
+        age = wait * rnd.choice([0.5, 2]) + 60
+        history[q["id"]] = {
+            "last": (now - timedelta(seconds=age)).isoformat(),
+            "box": box,
+            "correct": rnd.randint(0, 10),
+            "wrong": rnd.randint(0, 10),
+        }
+    return history
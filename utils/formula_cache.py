@@ -0,0 +1,82 @@
+import hashlib
+import io
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+
+# ------------------------------------------------------------
+# LaTeX-formules één keer renderen naar PNG (geheugen + schijf)
+# ------------------------------------------------------------
+class FormulaCache:
+    """
+    Rendert een LaTeX-formule (matplotlib mathtext) naar PNG-bytes.
+
+    Sleutel: hash van (formule, lettergrootte, dpi). Resultaten staan in een
+    LRU in het geheugen (`capacity` stuks) en op schijf in `directory`, dus
+    een herhaalde formule kost een dictionary-lookup. Er wordt geen pyplot
+    gebruikt: elke Figure hangt alleen aan een Agg-canvas en wordt na het
+    renderen vrijgegeven, zodat het geheugen vlak blijft.
+    """
+
+    def __init__(self, directory="data/cache/formulas", capacity=256, dpi=100):
+        self.directory = directory
+        self.capacity = capacity
+        self.dpi = dpi
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # sleutel → png-bytes
+
+    def key(self, latex, fontsize=18):
+        raw = f"{latex}\x00{fontsize}\x00{self.dpi}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def render(self, latex, fontsize=18):
+        """PNG-bytes van de formule (transparante achtergrond)."""
+        key = self.key(latex, fontsize)
+
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+                return png
+
+        path = os.path.join(self.directory, f"{key}.png")
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+        except OSError:
+            png = self._render(latex, fontsize)
+            self._write(path, png)
+
+        with self._lock:
+            self._memory[key] = png
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
+        return png
+
+    def _render(self, latex, fontsize):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(3, 1), dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        fig.text(0.5, 0.5, f"${latex}$", fontsize=fontsize, ha="center", va="center")
+
+        buf = io.BytesIO()
+        try:
+            fig.savefig(buf, format="png", dpi=self.dpi, transparent=True,
+                        bbox_inches="tight", pad_inches=0.05)
+        finally:
+            fig.clear()
+        return buf.getvalue()
+
+    def _write(self, path, png):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex[:6]}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Kon formule niet cachen: {e}")
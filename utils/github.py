@@ -0,0 +1,259 @@
+import base64
+import threading
+from collections import OrderedDict
+
+from utils import http_client
+
+
+# ------------------------------------------------------------
+# Gedeelde GitHub contents-client met SHA/ETag administratie
+# ------------------------------------------------------------
+class GitHubError(Exception):
+    """Onverwacht antwoord van de GitHub API."""
+
+    def __init__(self, status_code, text):
+        super().__init__(f"GitHub API fout {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class GitHubClient:
+    """
+    Lezen/schrijven van bestanden via de GitHub contents API.
+
+    Per pad wordt de laatst bekende blob-SHA, ETag en inhoud bewaard:
+    - get() stuurt If-None-Match mee; bij 304 komt de inhoud uit het geheugen
+      (LRU, begrensd op `content_bytes`)
+    - put() hergebruikt de bekende SHA (geen extra GET vooraf) en haalt de
+      SHA pas opnieuw op bij een conflict (409/422); de geschreven inhoud
+      wordt niet bewaard (uploads zouden anders in het geheugen blijven)
+    """
+
+    def __init__(self, token, repo_owner, repo_name, content_bytes=8 * 2**20):
+        self.token = token
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.headers = {"Authorization": f"token {self.token}"}
+
+        self._lock = threading.Lock()
+        self._sha = {}
+        self._etag = {}
+        self._content = OrderedDict()   # pad → inhoud (bytes of lijst namen), LRU
+        self._content_size = 0
+        self.content_bytes = content_bytes
+        self._large_dirs = set()        # mappen boven LIST_LIMIT: lijst via de trees API
+
+    LIST_LIMIT = 1000  # de contents API geeft hooguit zoveel items per map
+
+    def api_url(self, endpoint):
+        return f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/{endpoint}"
+
+    def contents_url(self, path):
+        return f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/{path}"
+
+    def raw_url(self, path, branch="main"):
+        return f"https://raw.githubusercontent.com/{self.repo_owner}/{self.repo_name}/{branch}/{path}"
+
+    def sha(self, path):
+        """Laatst bekende blob-SHA van `path` (of None)."""
+        return self._sha.get(path)
+
+    def _forget(self, path):
+        with self._lock:
+            self._sha.pop(path, None)
+            self._drop(path)
+
+    # ---- inhoud-cache (LRU op bytes) ----
+    @staticmethod
+    def _size(content):
+        if isinstance(content, bytes):
+            return len(content)
+        return sum(len(name) for name in content)   # lijst namen of {naam: sha}
+
+    def _drop(self, path):
+        """Inhoud + ETag van `path` vergeten (aanroeper houdt _lock vast)."""
+        self._etag.pop(path, None)
+        old = self._content.pop(path, None)
+        if old is not None:
+            self._content_size -= self._size(old)
+
+    def _remember(self, path, content, etag):
+        with self._lock:
+            self._drop(path)
+            size = self._size(content)
+            if not etag or size > self.content_bytes:
+                return   # zonder ETag (of te groot) heeft bewaren geen zin
+            self._content[path] = content
+            self._etag[path] = etag
+            self._content_size += size
+            while self._content_size > self.content_bytes:
+                old_path = next(iter(self._content))
+                self._drop(old_path)
+
+    def _conditional_headers(self, path):
+        """(headers, bewaarde inhoud): If-None-Match alleen als de inhoud er nog is."""
+        headers = dict(self.headers)
+        with self._lock:
+            cached = self._content.get(path)
+            if cached is not None:
+                self._content.move_to_end(path)
+                headers["If-None-Match"] = self._etag[path]
+        return headers, cached
+
+    # ---------------------------------------------------------
+    # Lezen (conditioneel)
+    # ---------------------------------------------------------
+    def get(self, path):
+        """
+        Geef de inhoud (bytes) van `path`, of None als het niet bestaat.
+        Een ongewijzigd bestand kost alleen een 304-antwoord.
+        """
+        headers, cached = self._conditional_headers(path)
+        r = http_client.get(self.contents_url(path), headers=headers)
+
+        if r.status_code == 304 and cached is not None:
+            return cached
+
+        if r.status_code == 404:
+            self._forget(path)
+            return None
+
+        if r.status_code != 200:
+            raise GitHubError(r.status_code, r.text)
+
+        meta = r.json()
+        content = base64.b64decode(meta.get("content", ""))
+
+        with self._lock:
+            self._sha[path] = meta.get("sha")
+        self._remember(path, content, r.headers.get("ETag"))
+        return content
+
+    def list_dir(self, path):
+        """Bestandsnamen in map `path` (lege lijst als de map niet bestaat)."""
+        if path in self._large_dirs:
+            return self._list_tree(path)
+
+        headers, cached = self._conditional_headers(path)
+        r = http_client.get(self.contents_url(path), headers=headers)
+
+        if r.status_code == 304 and cached is not None:
+            return cached
+
+        if r.status_code == 404:
+            self._forget(path)
+            return []
+
+        if r.status_code != 200:
+            raise GitHubError(r.status_code, r.text)
+
+        items = r.json()
+        if len(items) >= self.LIST_LIMIT:
+            # lijst afgekapt: de ETag hoort bij de eerste 1000 items en blijft
+            # 304 geven als er achteraan iets bijkomt → niet onder die ETag
+            # bewaren, maar voortaan via de tree-SHA controleren
+            self._forget(path)
+            with self._lock:
+                self._large_dirs.add(path)
+            return self._list_tree(path)
+
+        names = [item["name"] for item in items if item.get("type") == "file"]
+        self._remember(path, names, r.headers.get("ETag"))
+        return names
+
+    def _dir_sha(self, path):
+        """Tree-SHA van map `path` uit de (conditioneel opgehaalde) bovenliggende map."""
+        parent, _, name = path.rstrip("/").rpartition("/")
+        key = f"{parent}#dirs"
+        headers, cached = self._conditional_headers(key)
+        r = http_client.get(self.contents_url(parent), headers=headers)
+
+        if r.status_code == 304 and cached is not None:
+            return cached.get(name)
+        if r.status_code == 404:
+            self._forget(key)
+            return None
+        if r.status_code != 200:
+            raise GitHubError(r.status_code, r.text)
+
+        shas = {item["name"]: item["sha"] for item in r.json() if item.get("type") == "dir"}
+        self._remember(key, shas, r.headers.get("ETag"))
+        return shas.get(name)
+
+    def _list_tree(self, path):
+        """
+        Alle bestandsnamen in map `path` via de git trees API (geen limiet
+        van 1000). De lijst wordt bewaard onder de tree-SHA van de map: zolang
+        die gelijk is, kost controleren alleen een 304 op de bovenliggende map.
+        """
+        sha = self._dir_sha(path)
+        key = f"{path}#tree"
+        if sha is None:
+            self._forget(key)
+            return []
+
+        with self._lock:
+            cached = self._content.get(key)
+            if cached is not None and self._etag.get(key) == sha:
+                self._content.move_to_end(key)
+                return cached
+
+        r = http_client.get(self.api_url(f"git/trees/{sha}"), headers=self.headers)
+        if r.status_code != 200:
+            raise GitHubError(r.status_code, r.text)
+        tree = r.json()
+        if tree.get("truncated"):
+            print(f"⚠️ Maplijst van {path} is afgekapt door GitHub")
+        names = [item["path"] for item in tree.get("tree", []) if item.get("type") == "blob"]
+        self._remember(key, names, sha)
+        return names
+
+    # ---------------------------------------------------------
+    # Schrijven (SHA hergebruiken, alleen bij conflict opnieuw ophalen)
+    # ---------------------------------------------------------
+    def _put(self, path, data, message):
+        payload = {
+            "message": message,
+            "content": base64.b64encode(data).decode(),
+        }
+        sha = self._sha.get(path)
+        if sha:
+            payload["sha"] = sha
+        return http_client.put(self.contents_url(path), headers=self.headers, json=payload)
+
+    def put(self, path, data, message, overwrite=True):
+        """
+        Schrijf `data` (bytes) naar `path`. Geeft het response-object terug
+        zodat de aanroeper de statuscode kan controleren.
+
+        Met overwrite=False is het schrijven voorwaardelijk: bij een conflict
+        (bestand elders gewijzigd) komt de 409/422 terug in plaats van dat
+        de nieuwe SHA opgehaald en er alsnog overheen geschreven wordt.
+        """
+        r = self._put(path, data, message)
+
+        if r.status_code in (409, 422) and overwrite:
+            # SHA verouderd of onbekend → opnieuw ophalen en één keer herhalen
+            self._forget(path)
+            self.get(path)
+            r = self._put(path, data, message)
+
+        if r.status_code in (200, 201):
+            sha = r.json().get("content", {}).get("sha")
+            with self._lock:
+                self._sha[path] = sha
+                # de ETag van de GET hoort bij de oude inhoud; de nieuwe
+                # inhoud niet bewaren (alleen SHA nodig voor de volgende put)
+                self._drop(path)
+
+        return r
+
+    def delete(self, path, message):
+        """Verwijder `path` (SHA wordt zo nodig eerst opgehaald)."""
+        if not self._sha.get(path) and self.get(path) is None:
+            return None
+        payload = {"message": message, "sha": self._sha.get(path)}
+        r = http_client.request("DELETE", self.contents_url(path), headers=self.headers, json=payload)
+        if r.status_code in (200, 404):
+            self._forget(path)
+        return r
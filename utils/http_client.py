@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+
+from utils.startup import lazy_import
+
+requests = lazy_import("requests")  # pas laden bij het eerste request
+
+
+# ------------------------------------------------------------
+# Gedeelde HTTP-client: keep-alive pool, retry/backoff, timeouts
+# ------------------------------------------------------------
+DEFAULT_TIMEOUT = (3.05, 10)     # (connect, read) in seconden
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5               # seconden, verdubbelt per poging
+BACKOFF_MAX = 8.0
+MAX_CONCURRENCY = 8              # gelijktijdige requests per proces
+RETRY_STATUS = {500, 502, 503, 504}        # alleen bij idempotente methodes
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RATE_LIMIT_MAX_WAIT = 60.0       # langer wachten op een rate-limit-reset → antwoord teruggeven
+
+_session = None
+_session_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+
+def get_session():
+    """Eén requests.Session per proces, zodat TLS-verbindingen hergebruikt worden."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _backoff(attempt, response=None):
+    """Wachttijd vóór de volgende poging: Retry-After, anders 'full jitter'."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def _rate_limit_wait(r, attempt):
+    """
+    Wachttijd (s) als `r` een rate-limit-antwoord is, anders None: 429, of
+    GitHubs 403 met Retry-After of X-RateLimit-Remaining: 0 (tot de reset).
+    """
+    if r.status_code not in (403, 429):
+        return None
+    retry_after = r.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    if r.headers.get("X-RateLimit-Remaining") == "0":
+        reset = r.headers.get("X-RateLimit-Reset", "")
+        return max(0.0, float(reset) - time.time()) + 1 if reset.isdigit() else None
+    if r.status_code == 429:
+        return _backoff(attempt)
+    return None   # gewone 403 (geen rechten)
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, retries=MAX_RETRIES, **kwargs):
+    """
+    Voer een request uit via de gedeelde sessie.
+
+    - Rate-limit (429, of 403 van GitHub met Retry-After/X-RateLimit-*):
+      wachten tot de aangegeven tijd en opnieuw, voor elke methode (het
+      verzoek is niet uitgevoerd). Is de wachttijd langer dan
+      RATE_LIMIT_MAX_WAIT, dan komt het antwoord direct terug.
+    - 5xx en verbindingsfouten/timeouts: opnieuw met exponentiële backoff,
+      maar alleen voor idempotente methodes. Een PUT/POST/DELETE wordt
+      alleen herhaald als de verbinding niet eens tot stand kwam
+      (ConnectTimeout); anders kan hij dubbel uitgevoerd worden.
+
+    Na de laatste poging komt het antwoord (of de exceptie) gewoon terug
+    bij de aanroeper.
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        try:
+            with _slots:
+                r = get_session().request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+
+        wait = _rate_limit_wait(r, attempt)
+        if wait is not None:
+            if last or wait > RATE_LIMIT_MAX_WAIT:
+                return r
+            time.sleep(wait)
+            continue
+
+        if r.status_code not in RETRY_STATUS or not idempotent or last:
+            return r
+
+        time.sleep(_backoff(attempt, r))
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request("PUT", url, **kwargs)
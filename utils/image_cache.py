@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from utils import http_client
+
+
+# ------------------------------------------------------------
+# Gedeelde afbeeldingscache: geheugen (LRU) + schijf, per URL
+# ------------------------------------------------------------
+class ImageCache:
+    """
+    Afbeeldingen per URL, in twee lagen:
+    - geheugen: LRU begrensd op `memory_bytes`
+    - schijf:   `directory`, begrensd op `disk_bytes` (oudste eerst weg)
+
+    Binnen `ttl` seconden komt een afbeelding zonder netwerkverkeer uit de
+    cache; daarna volgt een conditionele GET (If-None-Match) die bij 304
+    alleen de controle-tijd bijwerkt. Gelijktijdige verzoeken voor dezelfde
+    ontbrekende afbeelding delen één download. Lukt hervalideren niet, dan
+    wordt de oude versie getoond.
+    """
+
+    def __init__(self, directory="data/cache/images", memory_bytes=32 * 2**20,
+                 disk_bytes=256 * 2**20, ttl=300):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # url → [etag, content, gecontroleerd]
+        self._memory_size = 0
+        self._inflight = {}            # url → threading.Event
+        self._disk = self._scan_disk()  # sleutel → grootte
+
+    # ---------------------------------------------------------
+    # Publiek
+    # ---------------------------------------------------------
+    def get(self, url, timeout=4):
+        """Inhoud (bytes) van `url`, of None als hij niet op te halen is."""
+        if not isinstance(url, str) or not url.strip():
+            return None
+
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry and time.monotonic() - entry[2] < self.ttl:
+                self._memory.move_to_end(url)
+                return entry[1]
+
+            event = self._inflight.get(url)
+            leader = event is None
+            if leader:
+                event = self._inflight[url] = threading.Event()
+
+        if not leader:
+            # een ander verzoek haalt hem al op → wachten en delen
+            event.wait(timeout + 1)
+            with self._lock:
+                entry = self._memory.get(url)
+            return entry[1] if entry else None
+
+        try:
+            return self._load(url, entry, timeout)
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            event.set()
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+    # ---------------------------------------------------------
+    # Ophalen / hervalideren
+    # ---------------------------------------------------------
+    def _load(self, url, entry, timeout):
+        if entry is None:
+            entry = self._read_disk(url)   # [etag, content, 0] of None
+
+        headers = {}
+        if entry and entry[0]:
+            headers["If-None-Match"] = entry[0]
+
+        try:
+            r = http_client.get(url, headers=headers, timeout=timeout, retries=1)
+        except Exception:
+            r = None
+
+        if r is not None and r.status_code == 304 and entry:
+            self._remember(url, entry[0], entry[1])
+            return entry[1]
+
+        if r is not None and r.status_code == 200:
+            etag = r.headers.get("ETag")
+            self._remember(url, etag, r.content)
+            self._write_disk(url, etag, r.content)
+            return r.content
+
+        if entry:
+            # fout bij hervalideren → oude versie tonen, later opnieuw proberen
+            self._remember(url, entry[0], entry[1])
+            return entry[1]
+        return None
+
+    def _remember(self, url, etag, content):
+        with self._lock:
+            old = self._memory.pop(url, None)
+            if old:
+                self._memory_size -= len(old[1])
+            if len(content) > self.memory_bytes:
+                return
+            self._memory[url] = [etag, content, time.monotonic()]
+            self._memory_size += len(content)
+            while self._memory_size > self.memory_bytes:
+                _, (_, evicted, _) = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    # ---------------------------------------------------------
+    # Schijflaag
+    # ---------------------------------------------------------
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".img", base + ".etag"
+
+    def _scan_disk(self):
+        sizes = {}
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".img"):
+                    sizes[entry.name[:-4]] = entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return sizes
+
+    def _read_disk(self, url):
+        key = self._key(url)
+        img_path, etag_path = self._paths(key)
+        try:
+            with open(img_path, "rb") as f:
+                content = f.read()
+            etag = None
+            if os.path.exists(etag_path):
+                with open(etag_path, "r", encoding="utf-8") as f:
+                    etag = f.read().strip() or None
+            os.utime(img_path)   # voor de opruimvolgorde (recent gebruikt)
+        except OSError:
+            return None
+        return [etag, content, 0.0]
+
+    def _write_disk(self, url, etag, content):
+        if len(content) > self.disk_bytes:
+            return
+        key = self._key(url)
+        img_path, etag_path = self._paths(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{img_path}.{uuid.uuid4().hex[:6]}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, img_path)
+            with open(etag_path, "w", encoding="utf-8") as f:
+                f.write(etag or "")
+        except OSError as e:
+            print(f"⚠️ Kon afbeelding niet cachen: {e}")
+            return
+
+        with self._lock:
+            self._disk[key] = len(content)
+            if sum(self._disk.values()) > self.disk_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Oudste (minst recent gebruikte) bestanden weg tot onder de grens."""
+        def mtime(key):
+            try:
+                return os.path.getmtime(self._paths(key)[0])
+            except OSError:
+                return 0
+
+        total = sum(self._disk.values())
+        for key in sorted(self._disk, key=mtime):
+            if total <= self.disk_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= self._disk.pop(key)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_image_cache():
+    """
+    De ene ImageCache van dit proces, gedeeld door alle pagina's en sessies
+    (twee instanties op dezelfde map zouden elk hun eigen schijftelling hebben).
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = ImageCache()
+    return _shared
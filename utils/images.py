@@ -0,0 +1,58 @@
+import hashlib
+import io
+
+
+# ------------------------------------------------------------
+# Upload-pijplijn voor afbeeldingen: hash, verkleinen, WebP
+# ------------------------------------------------------------
+#
+# Een upload wordt geïdentificeerd door de hash van de originele bytes
+# (dubbele uploads krijgen dezelfde naam en worden overgeslagen) en
+# opgeslagen als varianten in WebP:
+#   <hash>_display.webp – voor de quiz (max. DISPLAY_WIDTH breed)
+#   <hash>_thumb.webp   – voor overzichten (max. THUMB_WIDTH breed)
+
+VARIANTS = {
+    "display": 700,   # getoond op ±350 px → 2x voor scherpe schermen
+    "thumb": 160,
+}
+WEBP_QUALITY = 80
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def variant_name(digest, variant):
+    return f"{digest}_{variant}.webp"
+
+
+def _prepare(img):
+    from PIL import ImageOps
+
+    img = ImageOps.exif_transpose(img)   # telefoonfoto's rechtop
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        return img.convert("RGBA")
+    return img.convert("RGB")
+
+
+def make_variants(data):
+    """
+    {variant: webp-bytes} voor de afbeelding `data` (bytes). Er wordt nooit
+    vergroot. Gooit een fout als `data` geen leesbare afbeelding is.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as src:
+        src.load()
+        base = _prepare(src)
+
+    out = {}
+    for variant, width in VARIANTS.items():
+        img = base.copy()
+        if img.width > width:
+            img.thumbnail((width, round(img.height * width / img.width)), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", quality=WEBP_QUALITY, method=6)
+        out[variant] = buf.getvalue()
+    return out
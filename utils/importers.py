@@ -0,0 +1,310 @@
+import ast
+import csv
+import io
+import json
+import re
+from functools import lru_cache
+from itertools import islice
+
+
+# ------------------------------------------------------------
+# Streaming importers voor CSV en Excel (kolomsgewijs)
+# ------------------------------------------------------------
+#
+# Rijen worden in blokken van CHUNK_SIZE gelezen (geheugen begrensd,
+# ook bij grote werkmappen), per blok naar kolommen omgezet en per kolom
+# geconverteerd. Lijst-kolommen (choices, tags) gaan door een eigen
+# parser die herhaalde waarden onthoudt. Een foute rij wordt overgeslagen
+# en gerapporteerd in plaats van de hele import af te breken.
+
+CHUNK_SIZE = 1000
+TYPES = ("mc", "tf", "input")
+TEXT_COLUMNS = ("topic", "text", "explanation", "image_path", "formula_latex")
+OPTIONAL_COLUMNS = ("vak", "image_url")   # alleen overgenomen als de kolom bestaat
+
+_SIMPLE_LIST = re.compile(r"""\[\s*(?:'[^'\\]*'\s*,\s*)*(?:'[^'\\]*'\s*)?,?\s*\]""")
+_QUOTED = re.compile(r"'([^'\\]*)'")
+# wat ast.literal_eval op één kapotte cel kan gooien (→ RowError, geen afgebroken import)
+LITERAL_ERRORS = (ValueError, SyntaxError, TypeError, MemoryError, RecursionError)
+
+
+class RowError:
+    """Validatiefout in één rij (rij = regelnummer in het bestand, kop = 1)."""
+
+    __slots__ = ("row", "qid", "message")
+
+    def __init__(self, row, qid, message):
+        self.row = row
+        self.qid = qid
+        self.message = message
+
+    def __str__(self):
+        qid = f" ({self.qid})" if self.qid else ""
+        return f"rij {self.row}{qid}: {self.message}"
+
+    def __repr__(self):
+        return f"RowError({self.row!r}, {self.qid!r}, {self.message!r})"
+
+
+class ImportReport:
+    """Resultaat van een import: aantal geldige rijen en de fouten per rij."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = []
+
+    def __bool__(self):
+        return not self.errors
+
+    def summary(self, limit=10):
+        lines = [f"{self.count} vragen geïmporteerd, {len(self.errors)} rijen overgeslagen"]
+        lines += [f"  - {e}" for e in self.errors[:limit]]
+        if len(self.errors) > limit:
+            lines.append(f"  … en nog {len(self.errors) - limit}")
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------
+# Literal-parser (met geheugen voor herhaalde celwaarden)
+# ---------------------------------------------------------
+@lru_cache(maxsize=8192)
+def _parse_text(text):
+    if _SIMPLE_LIST.fullmatch(text):            # ['a', 'b'] – veruit het meest voorkomend
+        return tuple(_QUOTED.findall(text))
+    if text[0] in '[{"' or text in ("true", "false", "null"):
+        try:
+            value = json.loads(text)            # ["a", "b"], getallen
+            return tuple(value) if isinstance(value, list) else value
+        except ValueError:
+            pass
+    try:
+        value = int(text)
+    except ValueError:
+        try:
+            value = float(text)
+        except ValueError:
+            value = ast.literal_eval(text)      # al het andere (True, tuples, …)
+    return tuple(value) if isinstance(value, list) else value
+
+
+def parse_literal(value):
+    """
+    Celwaarde → Python-waarde, zoals ast.literal_eval maar sneller voor de
+    gangbare vormen. Lijsten komen terug als (gedeelde) tuple; de aanroeper
+    maakt er zo nodig een list van. Lege cellen → None.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return None if value != value else value   # NaN uit pandas → None
+    text = value.strip()
+    if not text or text.lower() == "nan":
+        return None
+    return _parse_text(text)
+
+
+def _text(value):
+    if value is None or value != value:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+# ---------------------------------------------------------
+# Rijen → vraag-dicts (per blok, kolomsgewijs)
+# ---------------------------------------------------------
+def _convert_chunk(header, numbered, report, required=()):
+    rownums = [k for k, _ in numbered]
+    rows = [r for _, r in numbered]
+    n = len(rows)
+    columns = {name: [r[i] if i < len(r) else None for r in rows] for i, name in enumerate(header) if name}
+
+    def column(name):
+        return columns.get(name) or [None] * n
+
+    ids = [_text(v).strip() for v in column("id")]
+    types = [_text(v).strip().lower() for v in column("type")]
+    text_cols = {name: list(map(_text, column(name))) for name in TEXT_COLUMNS}
+    optional = {name: list(map(_text, columns[name])) for name in OPTIONAL_COLUMNS if name in columns}
+
+    def literals(name, split=False):
+        out, errs = [], {}
+        for i, v in enumerate(column(name)):
+            try:
+                out.append(parse_literal(v))
+            except LITERAL_ERRORS:
+                if split and isinstance(v, str):   # tags als platte tekst: "DC, basis"
+                    out.append(tuple(p.strip() for p in v.split(",") if p.strip()))
+                    continue
+                out.append(None)
+                errs[i] = f"ongeldige waarde in '{name}': {v!r}"
+        return out, errs
+
+    choices, choice_errs = literals("choices")
+    tags, tag_errs = literals("tags", split=True)
+    answers = [a.strip() if isinstance(a, str) else a for a in column("answer")]
+    difficulties = column("difficulty")
+
+    for i in range(n):
+        rownum = rownums[i]
+        qid, qtype = ids[i], types[i]
+
+        error = choice_errs.get(i) or tag_errs.get(i)
+        for name in required:
+            if not _text(columns[name][i]).strip():
+                error = f"{name} ontbreekt"
+        if not qid:
+            error = "id ontbreekt"
+        elif qtype not in TYPES:
+            error = f"onbekend type {qtype!r} (verwacht {', '.join(TYPES)})"
+
+        c = choices[i] if choices[i] is not None else ()
+        t = tags[i] if tags[i] is not None else ()
+        if not error and not isinstance(c, tuple):
+            error = f"choices is geen lijst: {c!r}"
+        if not error and not isinstance(t, tuple):
+            t = (t,) if isinstance(t, str) else None
+            if t is None:
+                error = f"tags is geen lijst: {tags[i]!r}"
+
+        answer = None
+        if not error:
+            try:
+                answer = parse_literal(answers[i])
+            except LITERAL_ERRORS:
+                answer = answers[i]            # vrije tekst (bijv. input-vraag)
+            if qtype == "mc" and not (isinstance(answer, int) and 0 <= answer < len(c)):
+                error = f"answer {answer!r} is geen geldige index voor {len(c)} keuzes"
+
+        difficulty = 1
+        d = difficulties[i]
+        if not error and d is not None and d == d and _text(d).strip():
+            try:
+                difficulty = int(float(d))
+            except (TypeError, ValueError):
+                error = f"difficulty is geen getal: {d!r}"
+
+        if error:
+            report.errors.append(RowError(rownum, qid or None, error))
+            continue
+
+        q = {
+            "id": qid,
+            "type": qtype,
+            "topic": text_cols["topic"][i],
+            "text": text_cols["text"][i],
+            "choices": [str(x) for x in c],
+            "answer": answer,
+            "explanation": text_cols["explanation"][i],
+            "image_path": text_cols["image_path"][i],
+            "formula_latex": text_cols["formula_latex"][i],
+            "tags": [str(x) for x in t],
+            "difficulty": difficulty,
+        }
+        if qtype == "input":
+            try:
+                q["answer_numeric"] = float(answer)
+            except (TypeError, ValueError):
+                q["answer_numeric"] = None
+        else:
+            q["answer_numeric"] = None
+        for name, values in optional.items():
+            q[name] = values[i]
+
+        report.count += 1
+        yield q
+
+
+def _stream(header, rows, report, chunk_size, required=()):
+    header = [_text(h).strip().lower() for h in header]
+    missing = ({"id", "type"} | set(required)) - set(header)
+    if missing:
+        raise ValueError(f"verplichte kolommen ontbreken: {', '.join(sorted(missing))}")
+
+    rows = iter(rows)
+    first_row = 2
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        # lege regels overslaan, maar regelnummers behouden
+        numbered = [(first_row + k, r) for k, r in enumerate(chunk)
+                    if any(v is not None and v != "" for v in r)]
+        if numbered:
+            yield from _convert_chunk(header, numbered, report, required)
+        first_row += len(chunk)
+
+
+def read_csv(source, report=None, chunk_size=CHUNK_SIZE, required=()):
+    """
+    Vraag-dicts uit een CSV (pad of tekst-/bytes-bestand), als generator.
+    Fouten per rij komen in `report` (ImportReport); `required` zijn extra
+    kolommen die aanwezig en per rij gevuld moeten zijn.
+    """
+    report = report if report is not None else ImportReport()
+    wrapped = False
+    if not hasattr(source, "read"):
+        f = open(source, newline="", encoding="utf-8")
+    elif isinstance(source.read(0), bytes):
+        f, wrapped = io.TextIOWrapper(source, encoding="utf-8", newline=""), True
+    else:
+        f = source
+    try:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from _stream(header, reader, report, chunk_size, required)
+    finally:
+        if wrapped:
+            f.detach()       # bestand van de aanroeper niet sluiten
+        elif f is not source:
+            f.close()
+
+
+def _open_workbook(source):
+    import openpyxl
+    return openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+
+def _sheet_rows(ws):
+    rows = ws.iter_rows(values_only=True)
+    return next(rows, None), rows
+
+
+def read_excel(source, sheet_name=None, report=None, chunk_size=CHUNK_SIZE, required=()):
+    """
+    Vraag-dicts uit één tabblad (standaard het eerste) van een .xlsx,
+    als generator; de werkmap wordt read-only gestreamd.
+    """
+    report = report if report is not None else ImportReport()
+    wb = _open_workbook(source)
+    try:
+        ws = wb[sheet_name] if sheet_name is not None else wb.worksheets[0]
+        header, rows = _sheet_rows(ws)
+        if header is None:
+            return
+        yield from _stream(header, rows, report, chunk_size, required)
+    finally:
+        wb.close()
+
+
+def read_workbook(source, chunk_size=CHUNK_SIZE):
+    """
+    Alle tabbladen in één doorgang: {tabblad: ([vraag-dicts], ImportReport)}.
+    Een tabblad zonder geldige kop geeft een lege lijst met één fout.
+    """
+    result = {}
+    wb = _open_workbook(source)
+    try:
+        for ws in wb.worksheets:
+            report = ImportReport()
+            header, rows = _sheet_rows(ws)
+            try:
+                questions = list(_stream(header, rows, report, chunk_size)) if header else []
+            except ValueError as e:
+                questions = []
+                report.errors.append(RowError(1, None, str(e)))
+            result[ws.title] = (questions, report)
+    finally:
+        wb.close()
+    return result
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from models import Question
+from utils import http_client, shards
+
+
+# ------------------------------------------------------------
+# Vragenbron voor de quiz-app: vak → lijst compacte Question-objecten
+# ------------------------------------------------------------
+class QuestionSource:
+    """
+    Basis voor een vragenbron die periodiek (elke `ttl` seconden) op
+    wijzigingen controleert.
+
+    - Eén verzoek tegelijk ververst (single-flight); andere verzoeken krijgen
+      zolang de huidige data, zodat een verlopen TTL geen stormloop geeft.
+    - Bij een wijziging worden alleen de gewijzigde vakken vervangen; vragen
+      met dezelfde content-hash houden hun object. Een ongewijzigd vak houdt
+      dezelfde lijst, zodat due-indexen (index.source is questions) blijven.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._loaded = False
+        self._subjects = {}   # vak → (hash, [Question])
+        self._pool = {}       # vak → {vraag-hash: Question}
+
+    # ---- publiek ----
+    def subjects(self):
+        self._maybe_refresh()
+        return sorted(self._subjects)
+
+    def questions(self, vak):
+        self._maybe_refresh()
+        entry = self._subjects.get(vak)
+        return entry[1] if entry else []
+
+    def invalidate(self):
+        """Volgende aanroep controleert direct op wijzigingen."""
+        self._next_check = 0.0
+
+    # ---- verversen ----
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_check:
+            return
+        # al data → niet wachten als een ander verzoek al ververst
+        if not self._lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if time.monotonic() < self._next_check:
+                return
+            try:
+                self._refresh()
+                self._loaded = True
+            except Exception as e:
+                if not self._loaded:
+                    raise
+                print(f"⚠️ Vragen verversen mislukt, oude versie blijft: {e}")
+            # kleine spreiding: niet alle processen tegelijk opnieuw controleren
+            self._next_check = time.monotonic() + self.ttl * random.uniform(0.9, 1.1)
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        raise NotImplementedError
+
+    # ---- diff per vak / per vraag ----
+    def _update_subject(self, vak, questions):
+        """Vervang vak `vak`; geeft False als de inhoud niet veranderd is."""
+        questions = [q for q in questions if isinstance(q, dict)]
+        hashes = [shards.content_hash(q) for q in questions]
+        digest = hashlib.sha256("".join(hashes).encode("ascii")).hexdigest()[:16]
+
+        old = self._subjects.get(vak)
+        if old and old[0] == digest:
+            return False
+
+        pool = self._pool.get(vak, {})
+        new_pool = {}
+        objects = []
+        for h, q in zip(hashes, questions):
+            obj = new_pool.get(h) or pool.get(h) or Question.from_dict(q)
+            new_pool[h] = obj
+            objects.append(obj)
+
+        self._subjects[vak] = (digest, objects)
+        self._pool[vak] = new_pool
+        return True
+
+    def _replace_all(self, data):
+        """Volledige set vakken {vak: [dicts]}; verdwenen vakken vervallen."""
+        changed = [vak for vak, qs in data.items()
+                   if isinstance(qs, list) and self._update_subject(vak, qs)]
+        for vak in set(self._subjects) - set(data):
+            self._subjects.pop(vak, None)
+            self._pool.pop(vak, None)
+            changed.append(vak)
+        return changed
+
+
+class RemoteQuestionSource(QuestionSource):
+    """
+    Vragen via HTTP (GitHub raw). Elke controle is een conditionele GET
+    (If-None-Match): bij 304 wordt niets gedownload of geparsed.
+
+    Met een manifest (data/questions/manifest.json) wordt per vak alleen
+    het bestand opgehaald waarvan de hash in het manifest veranderd is;
+    zonder manifest de monolithische questions.json. Dat er geen manifest
+    is, wordt `layout_ttl` seconden onthouden: zolang kost een controle
+    één verzoek.
+    """
+
+    def __init__(self, base_url, json_path="data/questions.json", ttl=60, layout_ttl=600):
+        super().__init__(ttl)
+        self.layout_ttl = layout_ttl
+        self.base_url = base_url.rstrip("/")
+        self.json_url = f"{self.base_url}/{json_path}"
+        self.manifest_url = f"{self.base_url}/{shards.SHARD_DIR}/{shards.MANIFEST}"
+        self._etags = {}
+        self._manifest = None
+        self._manifest_check = 0.0   # monotonic-tijd van de volgende manifest-controle zonder manifest
+        self._shard_hash = {}   # vak → manifest-hash van de geladen versie
+        self._shard_retry = {}  # vak → monotonic-tijd waarna een mislukte fetch opnieuw mag
+        self._shard_locks = {}  # vak → Lock (één fetch per vak tegelijk)
+        self._shard_guard = threading.Lock()
+
+    def _fetch(self, url, conditional=True, **kwargs):
+        """(gewijzigd, inhoud): 304 → (False, None); 404 → (True, None)."""
+        headers = {}
+        if conditional and url in self._etags:
+            headers["If-None-Match"] = self._etags[url]
+
+        r = http_client.get(url, headers=headers, timeout=5, **kwargs)
+        if r.status_code == 304:
+            return False, None
+        if r.status_code == 404:
+            self._etags.pop(url, None)
+            return True, None
+        r.raise_for_status()
+
+        if conditional and r.headers.get("ETag"):
+            self._etags[url] = r.headers["ETag"]
+        return True, r.content
+
+    def _refresh(self):
+        if self._manifest is not None or time.monotonic() >= self._manifest_check:
+            changed, raw = self._fetch(self.manifest_url)
+            if changed:
+                manifest = shards.decode_manifest(raw) if raw is not None else None
+                if manifest is None and self._manifest is not None:
+                    self._etags.pop(self.json_url, None)   # terug naar questions.json: volledig ophalen
+                self._manifest = manifest
+            if self._manifest is None:
+                self._manifest_check = time.monotonic() + self.layout_ttl
+
+        if self._manifest is not None:
+            # vakken die niet meer in het manifest staan vervallen; de rest
+            # wordt pas bij gebruik (questions) opgehaald
+            for vak in set(self._subjects) - set(self._manifest["subjects"]):
+                self._subjects.pop(vak, None)
+                self._pool.pop(vak, None)
+                self._shard_hash.pop(vak, None)
+                self._shard_retry.pop(vak, None)
+            return
+
+        changed, raw = self._fetch(self.json_url)
+        if not changed:
+            return                      # 304: niets te parsen
+        data = json.loads(raw.decode("utf-8")) if raw is not None else {}
+        self._replace_all(data if isinstance(data, dict) else {})
+
+    def subjects(self):
+        self._maybe_refresh()
+        if self._manifest is not None:
+            return sorted(self._manifest["subjects"])
+        return sorted(self._subjects)
+
+    def questions(self, vak):
+        self._maybe_refresh()
+        manifest = self._manifest
+        if manifest is None:
+            entry = self._subjects.get(vak)
+            return entry[1] if entry else []
+
+        meta = manifest["subjects"].get(vak)
+        if meta is None:
+            return []
+        if self._shard_hash.get(vak) != meta["hash"] \
+                and time.monotonic() >= self._shard_retry.get(vak, 0.0):
+            with self._shard_guard:
+                lock = self._shard_locks.setdefault(vak, threading.Lock())
+            with lock:
+                if self._shard_hash.get(vak) != meta["hash"]:
+                    self._load_shard(vak, meta)
+        entry = self._subjects.get(vak)
+        return entry[1] if entry else []
+
+    def _load_shard(self, vak, meta):
+        """Haal het bestand van één vak op; bij een fout blijft de vorige versie staan."""
+        url = f"{self.base_url}/{shards.SHARD_DIR}/{meta['file']}"
+        try:
+            # hash in de query: geen verouderde kopie uit de CDN-cache
+            _, raw = self._fetch(url, conditional=False, params={"h": meta["hash"]})
+            if raw is None:
+                raise ValueError(f"{meta['file']} niet gevonden")
+            questions = shards.decode_shard(raw)
+        except Exception as e:
+            print(f"⚠️ Vak {vak} niet opgehaald, vorige versie blijft: {e}")
+            self._shard_retry[vak] = time.monotonic() + self.ttl
+            return
+
+        with self._lock:
+            self._update_subject(vak, questions)
+            self._shard_hash[vak] = meta["hash"]   # pas na een geslaagde decode
+        self._shard_retry.pop(vak, None)
+
+
+class LocalQuestionSource(QuestionSource):
+    """
+    Vragen van lokale schijf, voor self-hosted installaties.
+
+    `path` is een map met de vraagbank per vak (manifest.json + één bestand
+    per vak, of zonder manifest elk <vak>.json) of één vraag-JSON per vak.
+    Elke `ttl` seconden worden alleen mtime/grootte gecontroleerd; alleen
+    gewijzigde bestanden worden opnieuw ingelezen. Is de lokale bron er niet
+    (of onleesbaar bij de eerste keer), dan wordt `fallback` gebruikt.
+    """
+
+    def __init__(self, path, ttl=2, fallback=None):
+        super().__init__(ttl)
+        self.path = path
+        self.fallback = fallback
+        self._stats = {}   # vak (of het bestand zelf) → (mtime_ns, size)
+        self._files = {}   # vak → bestandsnaam
+        self._manifest_stat = None
+        self._warned = False
+
+    def _local(self):
+        """True als de lokale bron gebruikt kan worden, anders de fallback."""
+        if self.fallback is None:
+            return True
+        try:
+            self._maybe_refresh()
+        except (OSError, ValueError) as e:
+            if not self._warned:
+                print(f"⚠️ Lokale vragen niet beschikbaar ({e}), fallback gebruikt")
+                self._warned = True
+            self._next_check = time.monotonic() + self.ttl
+        return self._loaded
+
+    def subjects(self):
+        if not self._local():
+            return self.fallback.subjects()
+        return super().subjects()
+
+    def questions(self, vak):
+        if not self._local():
+            return self.fallback.questions(vak)
+        return super().questions(vak)
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        if not os.path.isdir(self.path):
+            key = self._stat(self.path)
+            if self._stats.get(self.path) != key:
+                with open(self.path, "rb") as f:
+                    data = json.load(f)
+                self._replace_all(data if isinstance(data, dict) else {})
+                self._stats = {self.path: key}
+            return
+
+        manifest_path = os.path.join(self.path, shards.MANIFEST)
+        if os.path.exists(manifest_path):
+            key = self._stat(manifest_path)
+            if key != self._manifest_stat:
+                with open(manifest_path, "rb") as f:
+                    manifest = shards.decode_manifest(f.read())
+                if manifest is None:
+                    raise ValueError(f"{manifest_path} is geen geldig manifest")
+                self._files = {vak: e["file"] for vak, e in manifest["subjects"].items()}
+                self._manifest_stat = key
+        else:
+            self._manifest_stat = None
+            self._files = {
+                name[:-len(".json")]: name
+                for name in os.listdir(self.path)
+                if name.endswith(".json") and not name.startswith(".")
+            }
+
+        stats = {}
+        for vak, fname in self._files.items():
+            try:
+                key = self._stat(os.path.join(self.path, fname))
+            except FileNotFoundError:
+                continue
+            if self._stats.get(vak) != key:
+                try:
+                    with open(os.path.join(self.path, fname), "rb") as f:
+                        self._update_subject(vak, shards.decode_shard(f.read()))
+                except ValueError as e:
+                    # bijv. half weggeschreven bestand: oude versie houden, later opnieuw
+                    print(f"⚠️ {fname} niet ingelezen: {e}")
+                    key = self._stats.get(vak)
+            stats[vak] = key
+
+        for vak in set(self._subjects) - set(stats):
+            self._subjects.pop(vak, None)
+            self._pool.pop(vak, None)
+        self._stats = stats
+
+
+def make_source(local_path=None, remote_url=None, ttl=60, poll=2):
+    """
+    Vragenbron volgens configuratie: lokaal (met remote als fallback als
+    die ook opgegeven is) of alleen remote.
+    """
+    remote = RemoteQuestionSource(remote_url, ttl=ttl) if remote_url else None
+    if local_path:
+        return LocalQuestionSource(local_path, ttl=poll, fallback=remote)
+    if remote is None:
+        raise ValueError("geen vragenbron geconfigureerd (lokaal pad of remote URL)")
+    return remote
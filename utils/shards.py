@@ -0,0 +1,142 @@
+import hashlib
+import json
+import re
+from collections.abc import MutableMapping
+
+
+# ------------------------------------------------------------
+# Vraagbank per vak: manifest + één bestand per vak
+# ------------------------------------------------------------
+#
+#   data/questions/manifest.json
+#       {"version": 1,
+#        "subjects": {"SoftwareOntwerp": {"file": "SoftwareOntwerp.json",
+#                                         "count": 42, "hash": "3f2a…"}}}
+#   data/questions/SoftwareOntwerp.json
+#       [ {vraag}, {vraag}, ... ]
+#
+# De quiz-app laadt alleen het manifest en haalt het gekozen vak op
+# wanneer het nodig is; Admin schrijft alleen de vakken die gewijzigd zijn.
+
+SHARD_DIR = "data/questions"
+MANIFEST = "manifest.json"
+VERSION = 1
+
+
+def shard_file(vak):
+    """Bestandsnaam voor een vak (alleen veilige tekens)."""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(vak)).strip("._") or "vak"
+    return f"{name}.json"
+
+
+def content_hash(questions):
+    """Hash van de inhoud van een vak (onafhankelijk van opmaak/volgorde van keys)."""
+    canonical = json.dumps(questions, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_shard(questions):
+    return json.dumps(questions, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def decode_shard(raw):
+    data = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+    return data if isinstance(data, list) else []
+
+
+def encode_manifest(manifest):
+    return json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def decode_manifest(raw):
+    """Manifest uit bytes/str, of None als het geen geldig manifest is."""
+    try:
+        data = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("subjects"), dict):
+        return None
+    return data
+
+
+def split(data, previous=None, keep=()):
+    """
+    Verdeel {vak: [vragen]} over shards.
+
+    Vakken in `keep` zijn niet geladen en blijven zoals ze in `previous`
+    staan (hun bestand wordt niet opnieuw geschreven).
+
+    Geeft (manifest, changed, removed):
+    - changed: {bestandsnaam: bytes} voor vakken die nieuw of gewijzigd zijn
+      t.o.v. het vorige manifest `previous`
+    - removed: bestandsnamen van vakken die niet meer bestaan
+    """
+    old = (previous or {}).get("subjects", {})
+    subjects = {vak: old[vak] for vak in keep if vak in old}
+    changed = {}
+    used = {entry.get("file") for entry in subjects.values()}
+
+    for vak, questions in data.items():
+        questions = questions if isinstance(questions, list) else []
+        fname = old.get(vak, {}).get("file") or shard_file(vak)
+        base, n = fname[:-len(".json")], 2
+        while fname in used:  # twee vaknamen met dezelfde veilige naam
+            fname, n = f"{base}_{n}.json", n + 1
+        used.add(fname)
+
+        entry = {"file": fname, "count": len(questions), "hash": content_hash(questions)}
+        subjects[vak] = entry
+
+        prev = old.get(vak)
+        if not prev or prev.get("hash") != entry["hash"] or prev.get("file") != fname:
+            changed[fname] = encode_shard(questions)
+
+    if keep:  # volgorde van het vorige manifest aanhouden, nieuwe vakken achteraan
+        subjects = {**{vak: subjects[vak] for vak in old if vak in subjects}, **subjects}
+    removed = sorted({e.get("file") for e in old.values()} - used - {None})
+    return {"version": VERSION, "subjects": subjects}, changed, removed
+
+
+class LazySubjects(MutableMapping):
+    """
+    {vak: [vragen]} volgens een manifest, waarbij een vak pas bij het
+    eerste gebruik opgehaald wordt via fetch(vak, manifest-entry).
+    Opslaan: loaded() is wat geschreven moet worden, unloaded() blijft staan.
+    """
+
+    def __init__(self, manifest, fetch):
+        self.manifest = manifest
+        self._fetch = fetch
+        self._names = list(manifest["subjects"])
+        self._loaded = {}
+
+    def __getitem__(self, vak):
+        if vak not in self._loaded:
+            if vak not in self._names:
+                raise KeyError(vak)
+            self._loaded[vak] = self._fetch(vak, self.manifest["subjects"][vak])
+        return self._loaded[vak]
+
+    def __setitem__(self, vak, questions):
+        if vak not in self._names:
+            self._names.append(vak)
+        self._loaded[vak] = questions
+
+    def __delitem__(self, vak):
+        self._names.remove(vak)
+        self._loaded.pop(vak, None)
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, vak):
+        return vak in self._names
+
+    def loaded(self):
+        return {vak: self._loaded[vak] for vak in self._names if vak in self._loaded}
+
+    def unloaded(self):
+        return [vak for vak in self._names if vak not in self._loaded]
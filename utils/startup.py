@@ -0,0 +1,190 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+
+# ------------------------------------------------------------
+# Opstarttijd: uitgestelde imports + import-profiler
+# ------------------------------------------------------------
+#
+# Zware modules (requests, numpy, PIL, matplotlib, pandas, openpyxl)
+# worden pas geladen door de functie die ze nodig heeft, of via
+# lazy_import() bij het eerste attribuut-gebruik.
+#
+# Profiler: zet DOCQUIZ_IMPORT_PROFILE=1 (optioneel =<aantal regels>) en
+# roep install_profiler() zo vroeg mogelijk aan; report() drukt daarna per
+# module de eigen en cumulatieve importtijd af.
+
+PROFILE_ENV = "DOCQUIZ_IMPORT_PROFILE"
+_T0 = time.perf_counter()
+
+
+class LazyModule:
+    """Proxy die de module pas importeert bij het eerste attribuut-gebruik."""
+
+    __slots__ = ("_name", "_module", "_lock")
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "geladen" if self._module is not None else "nog niet geladen"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """De module zelf als die al geladen is, anders een LazyModule."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+# ---------------------------------------------------------
+# Import-profiler
+# ---------------------------------------------------------
+class _TimedLoader:
+    """Omhulsel om een loader dat de uitvoertijd van de module meet."""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        spec = module.__spec__
+        # de echte loader terugzetten: code die de loader inspecteert blijft werken
+        spec.loader = self._loader
+        module.__loader__ = self._loader
+        self._profiler._enter(spec.name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(spec.name)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class ImportProfiler:
+    """Meet per module de eigen tijd (zonder sub-imports) en de cumulatieve tijd."""
+
+    def __init__(self):
+        self.stats = {}          # module → [eigen, cumulatief] (seconden)
+        self.marks = []          # (label, seconden sinds start)
+        self._local = threading.local()
+        self._finding = threading.local()
+
+    # sys.meta_path-finder: vraagt de spec aan de overige finders en
+    # vervangt alleen de loader
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def _enter(self, name):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        stack = self._local.stack
+        _, start, children = stack.pop()
+        total = time.perf_counter() - start
+        stat = self.stats.setdefault(name, [0.0, 0.0])
+        stat[0] += total - children
+        stat[1] += total
+        if stack:
+            stack[-1][2] += total
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - _T0))
+
+    def report(self, limit=20, file=None):
+        file = file or sys.stderr
+        total = sum(own for own, _ in self.stats.values())
+        rows = sorted(self.stats.items(), key=lambda kv: kv[1][0], reverse=True)
+
+        print(f"\n⏱  Importtijd: {total * 1000:.0f} ms in {len(self.stats)} modules", file=file)
+        print(f"{'eigen ms':>10} {'cumul. ms':>10}  module", file=file)
+        for name, (own, cumulative) in rows[:limit]:
+            print(f"{own * 1000:10.1f} {cumulative * 1000:10.1f}  {name}", file=file)
+
+        # per pakket opgeteld (numpy, PIL, matplotlib, ...)
+        packages = {}
+        for name, (own, _) in self.stats.items():
+            top = name.split(".")[0]
+            packages[top] = packages.get(top, 0.0) + own
+        print("\nper pakket:", file=file)
+        for top, own in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:10]:
+            print(f"{own * 1000:10.1f}  {top}", file=file)
+
+        for label, at in self.marks:
+            print(f"📍 {label}: {at * 1000:.0f} ms na start", file=file)
+
+
+_profiler = None
+_installed = False
+
+
+def install_profiler():
+    """Start de import-profiler als DOCQUIZ_IMPORT_PROFILE gezet is (één keer per proces)."""
+    global _profiler, _installed
+    if not _installed and os.environ.get(PROFILE_ENV):
+        _installed = True
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+def mark(label):
+    """Markeer een moment in het opstarten (bijv. 'eerste venster')."""
+    if _profiler is not None:
+        _profiler.mark(label)
+
+
+def report():
+    """Druk het profiel één keer af (no-op zonder profiler)."""
+    global _profiler
+    if _profiler is None:
+        return
+    profiler, _profiler = _profiler, None
+    try:
+        sys.meta_path.remove(profiler)
+    except ValueError:
+        pass
+    value = os.environ.get(PROFILE_ENV, "")
+    profiler.report(limit=int(value) if value.isdigit() and int(value) > 1 else 20)
@@ -0,0 +1,374 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+from utils.github import GitHubClient
+
+
+class ConflictError(Exception):
+    """De opgeslagen versie is elders gewijzigd sinds hij geladen werd."""
+
+
+# ------------------------------------------------------------
+# Opslag-backends voor HistoryStore
+# ------------------------------------------------------------
+class StorageBackend:
+    """
+    Interface voor opslag van de geschiedenis van één gebruiker:
+    - een snapshot {"user", "history": {qid: {...}}, "tag_stats", "seq"}
+    - een append-only event-log; "seq" in de snapshot is het laatste event
+      dat erin verwerkt is
+    """
+
+    def load(self, user):
+        """Geef het document terug, of None als het nog niet bestaat."""
+        raise NotImplementedError
+
+    def save(self, user, data, changed=None):
+        """
+        Sla het document op. `changed` is optioneel een verzameling qids
+        die sinds de vorige save gewijzigd zijn (backends mogen die
+        gebruiken om alleen het verschil weg te schrijven).
+        Geeft True terug bij succes. Gedeelde backends slaan alleen op als
+        de versie nog dezelfde is als bij de laatste load/save, en gooien
+        anders ConflictError.
+        """
+        raise NotImplementedError
+
+    def append_events(self, user, events):
+        """Voeg events (dicts met oplopende "seq") toe aan het log. True bij succes."""
+        raise NotImplementedError
+
+    def load_events(self, user, after_seq=0):
+        """Alle events met seq > after_seq, op volgorde."""
+        raise NotImplementedError
+
+    def revision(self, user, refresh=True):
+        """
+        Kenmerk van de opgeslagen versie (SHA, mtime, ...), of None als de
+        backend dat niet kan bepalen. Met refresh=False zonder netwerkverkeer.
+        """
+        return None
+
+    def head(self, user):
+        """
+        Hoogste seq in het log, alleen voor backends die door meerdere
+        instanties beschreven worden (anders None: geen controle nodig).
+        """
+        return None
+
+
+# ------------------------------------------------------------
+# Lokaal JSON-bestand: data/history/<user>.json (+ <user>.events.jsonl)
+# ------------------------------------------------------------
+class JSONFileBackend(StorageBackend):
+
+    def __init__(self, directory="data/history"):
+        self.directory = directory
+
+    def _path(self, user):
+        return os.path.join(self.directory, f"{user}.json")
+
+    def _events_path(self, user):
+        return os.path.join(self.directory, f"{user}.events.jsonl")
+
+    def load(self, user):
+        path = self._path(user)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, user, data, changed=None):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(user)
+
+        # eerst naar tijdelijk bestand, dan atomisch vervangen
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+        return True
+
+    def append_events(self, user, events):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._events_path(user), "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+
+    def load_events(self, user, after_seq=0):
+        path = self._events_path(user)
+        if not os.path.exists(path):
+            return []
+
+        events = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # half geschreven regel na crash
+                if event["seq"] > after_seq:
+                    events.append(event)
+        return events
+
+    def revision(self, user, refresh=True):
+        stamps = []
+        for path in (self._path(user), self._events_path(user)):
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps) if stamps[0] else None
+
+
+# ------------------------------------------------------------
+# SQLite: één rij per (user, vraag) → updates schrijven alleen het verschil
+# ------------------------------------------------------------
+class SQLiteBackend(StorageBackend):
+
+    def __init__(self, path="data/history/history.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS history (
+                user    TEXT NOT NULL,
+                qid     TEXT NOT NULL,
+                last    TEXT,
+                box     INTEGER NOT NULL DEFAULT 0,
+                correct INTEGER NOT NULL DEFAULT 0,
+                wrong   INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user, qid)
+            );
+            CREATE TABLE IF NOT EXISTS users (
+                user      TEXT PRIMARY KEY,
+                tag_stats TEXT NOT NULL DEFAULT '{}',
+                seq       INTEGER NOT NULL DEFAULT 0,
+                remote_pending INTEGER NOT NULL DEFAULT 0,
+                synced_seq     INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS events (
+                user    TEXT NOT NULL,
+                seq     INTEGER NOT NULL,
+                id      TEXT,
+                ts      TEXT NOT NULL,
+                qid     TEXT,
+                correct INTEGER NOT NULL,
+                latency REAL,
+                tags    TEXT,
+                PRIMARY KEY (user, seq)
+            );
+            """
+        )
+        # oudere databases missen nog kolommen in users
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(users)")]
+        for column in ("seq", "remote_pending", "synced_seq"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE users ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def load(self, user):
+        with self._lock:
+            meta = self._conn.execute(
+                "SELECT tag_stats, seq, remote_pending, synced_seq FROM users WHERE user = ?", (user,)
+            ).fetchone()
+            if meta is None:
+                return None
+
+            rows = self._conn.execute(
+                "SELECT qid, last, box, correct, wrong FROM history WHERE user = ?",
+                (user,),
+            ).fetchall()
+
+        history = {
+            qid: {"last": last, "box": box, "correct": correct, "wrong": wrong}
+            for qid, last, box, correct, wrong in rows
+        }
+        data = {
+            "user": user,
+            "history": history,
+            "tag_stats": json.loads(meta[0]),
+            "seq": meta[1],
+            "synced_seq": meta[3],
+        }
+        if meta[2]:
+            data["remote_pending"] = True
+        return data
+
+    def save(self, user, data, changed=None):
+        history = data.get("history", {})
+        qids = history.keys() if changed is None else [q for q in changed if q in history]
+
+        rows = [
+            (user, qid, h.get("last"), h.get("box", 0), h.get("correct", 0), h.get("wrong", 0))
+            for qid, h in ((qid, history[qid]) for qid in qids)
+        ]
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (user, tag_stats, seq, remote_pending, synced_seq) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user, json.dumps(data.get("tag_stats", {})), data.get("seq", 0),
+                 int(bool(data.get("remote_pending"))), data.get("synced_seq", 0)),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO history (user, qid, last, box, correct, wrong) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return True
+
+    def append_events(self, user, events):
+        rows = [
+            (
+                user,
+                e["seq"],
+                e.get("id"),
+                e["ts"],
+                e.get("qid"),
+                int(e["correct"]),
+                e.get("latency"),
+                json.dumps(e["tags"]) if e.get("tags") else None,
+            )
+            for e in events
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events (user, seq, id, ts, qid, correct, latency, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return True
+
+    def load_events(self, user, after_seq=0):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, id, ts, qid, correct, latency, tags FROM events "
+                "WHERE user = ? AND seq > ? ORDER BY seq",
+                (user, after_seq),
+            ).fetchall()
+
+        events = []
+        for seq, eid, ts, qid, correct, latency, tags in rows:
+            event = {"seq": seq, "id": eid, "user": user, "ts": ts, "correct": bool(correct)}
+            if qid is not None:
+                event["qid"] = qid
+                event["latency"] = latency
+            if tags:
+                event["tags"] = json.loads(tags)
+            events.append(event)
+        return events
+
+
+# ------------------------------------------------------------
+# GitHub contents API (primaire opslag of remote sync-doel)
+# ------------------------------------------------------------
+class GitHubBackend(StorageBackend):
+    """
+    Snapshot in data/history/<user>.json; het event-log staat in segmenten
+    data/history/<user>.events/<eerste>-<laatste>-<id>.jsonl. Elk segment
+    is een nieuw bestand, dus toevoegen kost één PUT zonder SHA.
+    """
+
+    def __init__(self, token, repo_owner, repo_name, directory="data/history", client=None):
+        self.directory = directory
+        self.client = client or GitHubClient(token, repo_owner, repo_name)
+        self._last_segment = None
+
+    @classmethod
+    def from_env(cls, token=None, repo_owner=None, repo_name=None):
+        """Maak een backend uit argumenten/omgevingsvariabelen, of None."""
+        token = token or os.environ.get("GITHUB_TOKEN")
+        repo_owner = repo_owner or os.environ.get("REPO_OWNER")
+        repo_name = repo_name or os.environ.get("REPO_NAME")
+
+        if not all([token, repo_owner, repo_name]):
+            return None
+        return cls(token, repo_owner, repo_name)
+
+    def _path(self, user):
+        return f"{self.directory}/{user}.json"
+
+    def _events_dir(self, user):
+        return f"{self.directory}/{user}.events"
+
+    @staticmethod
+    def _segment_range(name):
+        first, last = name.split("-")[:2]
+        return int(first), int(last)
+
+    def load(self, user):
+        content = self.client.get(self._path(user))
+        if content is None:
+            return None
+        return json.loads(content.decode("utf-8"))
+
+    def save(self, user, data, changed=None):
+        raw = json.dumps(data, indent=2).encode()
+
+        # voorwaardelijk op de SHA van de laatste load/save: nooit blind overschrijven
+        r = self.client.put(self._path(user), raw, f"Update history for {user}", overwrite=False)
+        if r.status_code in (409, 422):
+            raise ConflictError(f"{self._path(user)} is elders gewijzigd")
+        if r.status_code not in (200, 201):
+            print("⚠️ Opslagfout:", r.status_code, r.text)
+            return False
+        return True
+
+    def append_events(self, user, events):
+        if not events:
+            return True
+
+        name = f"{events[0]['seq']:08d}-{events[-1]['seq']:08d}-{uuid.uuid4().hex[:6]}.jsonl"
+        raw = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events).encode()
+
+        r = self.client.put(f"{self._events_dir(user)}/{name}", raw, f"Log answers for {user}")
+        if r.status_code not in (200, 201):
+            print("⚠️ Opslagfout:", r.status_code, r.text)
+            return False
+        self._last_segment = name
+        return True
+
+    def load_events(self, user, after_seq=0):
+        directory = self._events_dir(user)
+        names = [n for n in self.client.list_dir(directory) if n.endswith(".jsonl")]
+        self._last_segment = max(names) if names else None
+        names = sorted(n for n in names if self._segment_range(n)[1] > after_seq)
+
+        events = []
+        for name in names:
+            raw = self.client.get(f"{directory}/{name}") or b""
+            for line in raw.decode("utf-8").splitlines():
+                if line.strip():
+                    event = json.loads(line)
+                    if event["seq"] > after_seq:
+                        events.append(event)
+        return events
+
+    def head(self, user):
+        # alleen de (conditionele) maplijst: snapshot-SHA niet bijwerken
+        names = [n for n in self.client.list_dir(self._events_dir(user)) if n.endswith(".jsonl")]
+        self._last_segment = max(names) if names else None
+        return max((self._segment_range(n)[1] for n in names), default=0)
+
+    def revision(self, user, refresh=True):
+        path = self._path(user)
+        if refresh:
+            # conditioneel: ongewijzigd kost alleen 304-antwoorden
+            self.client.get(path)
+            names = self.client.list_dir(self._events_dir(user))
+            self._last_segment = max(names) if names else None
+        return (self.client.sha(path), self._last_segment)
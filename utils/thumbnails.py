@@ -0,0 +1,96 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+
+# ------------------------------------------------------------
+# Gedecodeerde, verkleinde afbeeldingen met achtergrond-prefetch
+# ------------------------------------------------------------
+class ThumbnailCache:
+    """
+    Afbeeldingen van schijf, gedecodeerd en verkleind tot `size`, als
+    PIL-images in een LRU van `capacity` stuks (sleutel: pad + mtime).
+
+    prefetch() zet paden in de wachtrij van één achtergrond-thread, zodat
+    openen/decoderen/verkleinen niet op de Tk-hoofdthread gebeurt. De
+    PhotoImage zelf maakt de aanroeper (Tk is niet thread-safe).
+    """
+
+    def __init__(self, size=(300, 200), capacity=64):
+        self.size = size
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._images = OrderedDict()   # (pad, mtime_ns) → PIL.Image
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._worker = None
+
+    @staticmethod
+    def _key(path):
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _decode(self, path):
+        from PIL import Image
+
+        with Image.open(path) as img:
+            img.draft("RGB", self.size)    # JPEG: direct op lagere resolutie decoderen
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            return img.resize(self.size)
+
+    def _store(self, key, img):
+        with self._lock:
+            self._images[key] = img
+            self._images.move_to_end(key)
+            while len(self._images) > self.capacity:
+                self._images.popitem(last=False)
+
+    def cached(self, path):
+        """Het verkleinde beeld als het al klaarstaat, anders None."""
+        key = self._key(path)
+        with self._lock:
+            img = self._images.get(key)
+            if img is not None:
+                self._images.move_to_end(key)
+            return img
+
+    def get(self, path):
+        """Het verkleinde beeld; zo nodig nu direct decoderen."""
+        img = self.cached(path)
+        if img is None:
+            key = self._key(path)
+            if key is None:
+                raise FileNotFoundError(path)
+            img = self._decode(path)
+            self._store(key, img)
+        return img
+
+    # ---------------------------------------------------------
+    # Achtergrond-thread
+    # ---------------------------------------------------------
+    def prefetch(self, paths):
+        """Decodeer deze afbeeldingen alvast op de achtergrond."""
+        for path in paths:
+            if not path or path in self._queued or self.cached(path) is not None:
+                continue
+            self._queued.add(path)
+            self._queue.put(path)
+
+        if self._worker is None and not self._queue.empty():
+            self._worker = threading.Thread(target=self._run, name="thumbnail-prefetch", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                key = self._key(path)
+                if key is not None and self.cached(path) is None:
+                    self._store(key, self._decode(path))
+            except Exception as e:
+                print(f"Kon afbeelding niet voorladen: {e}")
+            finally:
+                self._queued.discard(path)
@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+import io
+from collections import OrderedDict
 from models import Question
+from utils.formula_cache import FormulaCache
+from utils.thumbnails import ThumbnailCache
 from tkinter import messagebox
+import time
 
 
 class QuizView(tk.Frame):
@@ -28,24 +30,32 @@ class QuizView(tk.Frame):
 
         self.formula_frame = tk.Frame(self)
         self.formula_frame.pack(pady=10)
+        self.formula_label = tk.Label(self.formula_frame)
+        self.formula_label.pack()
 
         ttk.Button(self, text="Volgende", command=self.on_next).pack(pady=15)
 
         self.current_question = None
         self.selected_value = tk.StringVar()
         self.image_cache = None  # voorkom dat de afbeelding verdwijnt
+        self.thumbnails = ThumbnailCache(size=(300, 200))
+        self._photos = OrderedDict()  # pad → (beeld, PhotoImage), LRU; alleen op de hoofdthread maken
+        self.formulas = FormulaCache()
+        self._formula_photos = {}  # formule → PhotoImage
+        self.shown_at = None
+        self.answer_latency = None  # bedenktijd (s) van het laatste antwoord
 
     def show_question(self, q: Question):
         """Toon een nieuwe vraag op het scherm."""
         self.current_question = q
+        self.shown_at = time.monotonic()
         self.question_label.config(text=q.text)
 
         # Oude widgets wissen
         for widget in self.answer_frame.winfo_children():
             widget.destroy()
-        for widget in self.formula_frame.winfo_children():
-            widget.destroy()
         self.image_label.config(image="")
+        self.formula_label.config(image="")
 
         self.selected_value.set("")
 
@@ -66,9 +76,7 @@ class QuizView(tk.Frame):
         # ---- afbeelding tonen ----
         if hasattr(q, "image_path") and q.image_path:
             try:
-                img = Image.open(q.image_path)
-                img = img.resize((300, 200))
-                self.image_cache = ImageTk.PhotoImage(img)
+                self.image_cache = self._photo(q.image_path)
                 self.image_label.config(image=self.image_cache)
             except Exception as e:
                 print(f"Kon afbeelding niet laden: {e}")
@@ -76,22 +84,47 @@ class QuizView(tk.Frame):
         # ---- formule tonen ----
         if hasattr(q, "formula_latex") and q.formula_latex:
             try:
-                fig, ax = plt.subplots(figsize=(3, 1))
-                ax.text(0.5, 0.5, f"${q.formula_latex}$", fontsize=18, ha="center", va="center")
-                ax.axis("off")
-
-                canvas = FigureCanvasTkAgg(fig, master=self.formula_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack()
+                self.formula_label.config(image=self._formula(q.formula_latex))
             except Exception as e:
                 print(f"Kon formule niet renderen: {e}")
 
+    def prefetch(self, questions):
+        """Afbeeldingen van de komende vragen alvast op de achtergrond laden."""
+        self.thumbnails.prefetch([q.image_path for q in questions if getattr(q, "image_path", None)])
+
+    def _photo(self, path):
+        from PIL import ImageTk
+
+        # meestal al door de prefetch-thread gedecodeerd → alleen PhotoImage maken
+        img = self.thumbnails.get(path)
+        photo = self._photos.get(path)
+        if photo is None or photo[0] is not img:
+            photo = self._photos[path] = (img, ImageTk.PhotoImage(img))
+        self._photos.move_to_end(path)   # LRU: het getoonde beeld wordt als laatste verdrongen
+        while len(self._photos) > self.thumbnails.capacity:
+            self._photos.popitem(last=False)
+        return photo[1]
+
+    def _formula(self, latex, fontsize=18):
+        from PIL import Image, ImageTk
+
+        # één keer renderen (FormulaCache), daarna alleen een lookup
+        photo = self._formula_photos.get((latex, fontsize))
+        if photo is None:
+            png = self.formulas.render(latex, fontsize)
+            if len(self._formula_photos) >= self.formulas.capacity:
+                self._formula_photos.pop(next(iter(self._formula_photos)))
+            photo = self._formula_photos[(latex, fontsize)] = ImageTk.PhotoImage(Image.open(io.BytesIO(png)))
+        return photo
+
     def on_next(self):
             answer = self.selected_value.get()
             if not answer:
                 tk.messagebox.showinfo("Let op", "Kies of vul eerst een antwoord in!")
                 return
 
+            self.answer_latency = time.monotonic() - self.shown_at
+
             # Controleer antwoord
             q = self.current_question
             correct = False
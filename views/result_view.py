@@ -1,7 +1,81 @@
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+
+
+class TagChart:
+    """
+    Gestapelde staafgrafiek goed/fout per tag met één vaste Figure + canvas.
+
+    Tellers worden incrementeel bijgehouden (add); refresh() past alleen de
+    hoogtes van de gewijzigde staven aan. Alleen als er een nieuwe tag
+    bijkomt worden de staven (op dezelfde figure) opnieuw opgebouwd.
+    """
+
+    def __init__(self, master):
+        self.master = master
+        self.counts = {}      # tag → [goed, fout]
+        self._dirty = set()
+        self._tags = []       # volgorde van de getekende staven
+        self._bars = None     # (staven goed, staven fout)
+        self._figure = None
+        self._canvas = None
+
+    def load(self, tag_stats):
+        """Alle tellers opnieuw uit tag_stats (bij start of na herladen)."""
+        self.counts = {t: [v.get("correct", 0), v.get("wrong", 0)] for t, v in tag_stats.items()}
+        self._dirty = set(self.counts)
+        self._tags = []
+
+    def add(self, tags, correct):
+        for tag in tags:
+            c = self.counts.setdefault(tag, [0, 0])
+            c[0 if correct else 1] += 1
+            self._dirty.add(tag)
+
+    def _ensure_canvas(self):
+        if self._canvas is None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.figure import Figure
+
+            self._figure = Figure(figsize=(4, 3))
+            self._ax = self._figure.add_subplot()
+            self._canvas = FigureCanvasTkAgg(self._figure, master=self.master)
+            self._canvas.get_tk_widget().pack()
+
+    def _rebuild(self):
+        ax = self._ax
+        ax.clear()
+        self._tags = list(self.counts)
+        correct = [self.counts[t][0] for t in self._tags]
+        wrong = [self.counts[t][1] for t in self._tags]
+        self._bars = (
+            ax.bar(self._tags, correct, label="Goed"),
+            ax.bar(self._tags, wrong, bottom=correct, label="Fout"),
+        )
+        ax.set_ylabel("Aantal antwoorden")
+        ax.legend()
+        ax.set_title("Voortgang per onderwerp")
+
+    def refresh(self):
+        if not self.counts:
+            return
+        self._ensure_canvas()
+
+        if self._bars is None or len(self._tags) != len(self.counts) or set(self._tags) != set(self.counts):
+            self._rebuild()
+        else:
+            good_bars, wrong_bars = self._bars
+            for i, tag in enumerate(self._tags):
+                if tag in self._dirty:
+                    good, wrong = self.counts[tag]
+                    good_bars[i].set_height(good)
+                    wrong_bars[i].set_y(good)
+                    wrong_bars[i].set_height(wrong)
+            top = max(g + w for g, w in self.counts.values())
+            self._ax.set_ylim(0, max(1, top) * 1.05)
+
+        self._dirty.clear()
+        self._canvas.draw_idle()
 
 
 class ResultView(tk.Frame):
@@ -14,12 +88,19 @@ class ResultView(tk.Frame):
         self.summary_label = tk.Label(self, text="", font=("Arial", 12))
         self.summary_label.pack(pady=5)
 
-        # Grafiekcontainer
+        # Grafiekcontainer (één figure, blijft bestaan tussen sessies)
         self.chart_frame = tk.Frame(self)
         self.chart_frame.pack(pady=10)
+        self.chart = TagChart(self.chart_frame)
+        self._tag_stats = None
 
         ttk.Button(self, text="Opnieuw starten", command=self.on_restart).pack(pady=15)
 
+    def record_answer(self, tags, correct):
+        """Tellers per tag bijwerken na elk antwoord (zoals HistoryStore.update_tags)."""
+        if self._tag_stats is not None and tags:
+            self.chart.add(tags, correct)
+
     def show_results(self, results, tag_stats):
         """
         results = {'correct': x, 'wrong': y}
@@ -31,26 +112,13 @@ class ResultView(tk.Frame):
             text=f"Goed: {results['correct']}  |  Fout: {results['wrong']}  |  Score: {perc:.1f}%"
         )
 
-        # Oude grafiek wissen
-        for w in self.chart_frame.winfo_children():
-            w.destroy()
-
-        # Grafiek tekenen
-        if tag_stats:
-            tags = list(tag_stats.keys())
-            correct = [v["correct"] for v in tag_stats.values()]
-            wrong = [v["wrong"] for v in tag_stats.values()]
-
-            fig, ax = plt.subplots(figsize=(4, 3))
-            ax.bar(tags, correct, label="Goed")
-            ax.bar(tags, wrong, bottom=correct, label="Fout")
-            ax.set_ylabel("Aantal antwoorden")
-            ax.legend()
-            ax.set_title("Voortgang per onderwerp")
-
-            canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack()
+        # alleen bij de eerste keer (of na herladen van de history) alles inlezen;
+        # daarna zijn de tellers al via record_answer bijgewerkt
+        if tag_stats is not self._tag_stats:
+            self.chart.load(tag_stats)
+            self._tag_stats = tag_stats
+
+        self.chart.refresh()
 
     def on_restart(self):
         self.restart_callback()